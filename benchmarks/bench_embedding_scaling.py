@@ -0,0 +1,72 @@
+"""
+Embedding throughput vs. cores.
+
+Embeds a synthetic corpus with a single in-process BGEEmbedder and with
+ShardedEmbedder at increasing worker counts, and prints chunks/sec for each.
+Model loading is excluded from the timings (each configuration is warmed up
+first).
+
+    python -m benchmarks.bench_embedding_scaling --chunks 4000 --workers 1 2 4 8
+"""
+
+import argparse
+import random
+import time
+
+from rag_enginex.cpu_policy import CPUPolicy, available_cores
+from rag_enginex.embedder import BGEEmbedder, ShardedEmbedder
+
+WORDS = (
+    "retrieval augmented generation index vector query answer context document "
+    "chunk embedding model rerank score latency throughput shard worker policy"
+).split()
+
+
+def make_chunks(n: int, words_per_chunk: int = 150, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=words_per_chunk)) for _ in range(n)]
+
+
+def bench_single(chunks, model_name: str, batch_size: int) -> float:
+    embedder = BGEEmbedder(model_name, policy=CPUPolicy(intra_op_threads=len(available_cores())))
+    embedder.embed(chunks[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    embedder.embed(chunks, batch_size=batch_size)
+    return len(chunks) / (time.perf_counter() - start)
+
+
+def bench_sharded(chunks, model_name: str, workers: int, batch_size: int) -> float:
+    with ShardedEmbedder(model_name, num_workers=workers, batch_size=batch_size) as embedder:
+        # One warm-up task per worker so every model is loaded before timing
+        embedder.embed(chunks[: embedder.task_size * len(embedder.groups)])
+        start = time.perf_counter()
+        embedder.embed(chunks)
+        return len(chunks) / (time.perf_counter() - start)
+
+
+def main():
+    cores = len(available_cores())
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--model", default="BAAI/bge-base-en")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument(
+        "--workers", type=int, nargs="+",
+        default=[w for w in (1, 2, 4, 8, 16, 32) if w <= cores],
+    )
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    print(f"{cores} cores available, {len(chunks)} chunks\n")
+    print(f"{'mode':<22}{'chunks/sec':>12}{'speedup':>10}")
+
+    baseline = bench_single(chunks, args.model, args.batch_size)
+    print(f"{'single process':<22}{baseline:>12.1f}{1.0:>10.2f}")
+
+    for workers in args.workers:
+        rate = bench_sharded(chunks, args.model, workers, args.batch_size)
+        print(f"{f'sharded x{workers}':<22}{rate:>12.1f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
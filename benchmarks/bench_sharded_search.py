@@ -0,0 +1,70 @@
+"""
+Search latency vs. number of shards.
+
+Builds a synthetic corpus of random float32 vectors, writes it as 1, 2, 4, ...
+shards, serves each layout with local shard processes and reports p50/p95
+latency of single-query searches (plus the unsharded in-process baseline).
+No model download is needed.
+
+    python -m benchmarks.bench_sharded_search --vectors 500000 --shards 1 2 4 8
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from rag_enginex.sharded_store import ShardedVectorStore, write_shards
+from rag_enginex.vector_store import FAISSVectorestore
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.95) - 1]
+
+
+def time_queries(store, queries, top_k: int):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.search(query, top_k=top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return percentiles(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.vectors, args.dim), dtype=np.float32)
+    chunks = [f"chunk {i}" for i in range(args.vectors)]
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    print(f"{args.vectors} x {args.dim} vectors, {args.queries} queries, top_k={args.top_k}\n")
+    print(f"{'layout':<18}{'p50 ms':>10}{'p95 ms':>10}")
+
+    baseline = FAISSVectorestore(dim=args.dim)
+    baseline.add_embeddings(vectors, chunks)
+    p50, p95 = time_queries(baseline, queries, args.top_k)
+    print(f"{'in-process':<18}{p50:>10.2f}{p95:>10.2f}")
+    del baseline
+
+    for num_shards in args.shards:
+        with tempfile.TemporaryDirectory() as index_path:
+            write_shards(vectors, chunks, num_shards, index_path, lexical=False)
+            with ShardedVectorStore.launch_local(index_path, timeout=30.0) as store:
+                time_queries(store, queries[:10], args.top_k)  # warm up connections
+                p50, p95 = time_queries(store, queries, args.top_k)
+            print(f"{f'{num_shards} shard(s)':<18}{p50:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cold-start cost: import time per module and time to first query.
+
+Every measurement runs in a fresh interpreter so nothing is cached between
+runs. Import rows also list which heavy dependencies the import dragged in.
+Time to first query covers import + model load + indexing a small synthetic
+corpus + one search (and one rerank with --rerank); no LLM call is made.
+
+    python -m benchmarks.bench_startup --repeat 5 --rerank
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "rag_enginex",
+    "rag_enginex.chunker",
+    "rag_enginex.vector_store",
+    "rag_enginex.embedder",
+    "rag_enginex.llm_answer",
+    "rag_enginex.evaluator",
+    "rag_enginex.pipeline",
+]
+
+HEAVY = ["torch", "sentence_transformers", "streamlit", "sklearn", "langchain_openai", "langchain_groq"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+FIRST_QUERY_SNIPPET = """
+import json, time
+t = time.perf_counter()
+from rag_enginex import pipeline
+imported = time.perf_counter()
+embedder = pipeline.BGEEmbedder()
+chunks = ["chunk number %d about retrieval and indexing" % i for i in range({chunks})]
+embeddings = embedder.embed(chunks)
+store = pipeline.FAISSVectorestore(dim=embeddings.shape[1])
+store.add_embeddings(embeddings, chunks)
+ready = time.perf_counter()
+results = pipeline.search_vector_store("what is indexing?", store, embedder, top_k=5)
+if {rerank}:
+    pipeline.rerank("what is indexing?", results, top_n=3)
+done = time.perf_counter()
+print(json.dumps({{"import": imported - t, "ready": ready - t, "first_query": done - t}}))
+"""
+
+
+def run_snippet(code: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunks", type=int, default=64)
+    parser.add_argument("--rerank", action="store_true", help="Include a rerank call in the first query.")
+    parser.add_argument("--skip-query", action="store_true", help="Only measure imports (no models needed).")
+    args = parser.parse_args()
+
+    print(f"{'module':<28}{'median import (ms)':>20}  heavy deps loaded")
+    for module in MODULES:
+        runs = [run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY)) for _ in range(args.repeat)]
+        median_ms = statistics.median(r["seconds"] for r in runs) * 1000
+        print(f"{module:<28}{median_ms:>20.1f}  {', '.join(runs[-1]['loaded']) or '-'}")
+
+    if args.skip_query:
+        return
+
+    runs = [
+        run_snippet(FIRST_QUERY_SNIPPET.format(chunks=args.chunks, rerank=args.rerank))
+        for _ in range(args.repeat)
+    ]
+    print()
+    for key, label in (("import", "import pipeline"), ("ready", "index ready"), ("first_query", "first query done")):
+        print(f"{label:<28}{statistics.median(r[key] for r in runs) * 1000:>20.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory and time of the embedder → FAISS hand-off: nested lists vs. float32 arrays.
+
+Simulates the encoder output for N chunks (a float32 matrix, as
+SentenceTransformer.encode returns) and pushes it into FAISSVectorestore two
+ways:
+
+    list  : .tolist() → np.array(...).astype("float32") → index   (old path)
+    array : float32 matrix passed straight through                (current path)
+
+Peak extra memory is measured with tracemalloc (NumPy reports its buffers to
+it), on top of the encoder output itself. No model download is needed.
+
+    python -m benchmarks.bench_vector_memory --chunks 100000 --dim 768
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+from rag_enginex.vector_store import FAISSVectorestore
+
+
+def legacy_list_path(vectors: np.ndarray, chunks):
+    embeddings = vectors.tolist()
+    store = FAISSVectorestore(dim=vectors.shape[1])
+    store.add_embeddings(np.array(embeddings).astype("float32"), chunks)
+    return embeddings, store
+
+
+def array_path(vectors: np.ndarray, chunks):
+    store = FAISSVectorestore(dim=vectors.shape[1])
+    store.add_embeddings(vectors, chunks)
+    return vectors, store
+
+
+def measure(fn, vectors, chunks):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(vectors, chunks)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+    chunks = [f"chunk {i}" for i in range(args.chunks)]
+    print(f"{args.chunks} x {args.dim} float32 encoder output = {vectors.nbytes / 2**20:.1f} MiB\n")
+    print(f"{'path':<8}{'peak extra MiB':>16}{'seconds':>10}")
+
+    for name, fn in (("list", legacy_list_path), ("array", array_path)):
+        peak, elapsed = measure(fn, vectors, chunks)
+        print(f"{name:<8}{peak / 2**20:>16.1f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
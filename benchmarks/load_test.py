@@ -0,0 +1,355 @@
+"""
+Concurrent load test for pipeline.process_query.
+
+Replays a question set against a real index (retrieval, reranking and, with
+--evaluate, scoring all run for real) while Groq is replaced by a local stub
+that sleeps for a configurable, jittered latency. Nothing leaves the machine;
+the embedding/reranker models only need to be in the local HuggingFace cache.
+
+Each concurrency level is run either closed-loop (N users issuing requests
+back to back) or open-loop (--rate: Poisson arrivals at a fixed rate, served by
+at most N workers; latency then includes queueing). For every level the report
+holds throughput, latency percentiles, per-stage breakdown, and CPU / RSS
+sampled over time. Reports are JSON so runs can be compared across releases:
+
+    python -m benchmarks.load_test --pdf manual.pdf --concurrency 1 4 16 --requests 200 \\
+        --report reports/v1.4.json --compare reports/v1.3.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rag_enginex import evaluator, llm_answer, pipeline
+from rag_enginex.cli import LLM_ERROR_PREFIXES, read_questions
+from rag_enginex.llm_scheduler import LLMScheduler, get_scheduler, set_scheduler
+
+DEFAULT_QUESTIONS = [
+    "What is the main idea of the document?",
+    "Summarize the key results.",
+    "Which methods or tools are described?",
+    "What are the limitations mentioned?",
+    "List the most important names and numbers.",
+]
+
+STAGES = ("retrieve", "rerank", "generate", "evaluate")
+
+
+# ----------------------------
+# Stub LLM
+# ----------------------------
+def make_stub_llm(mean_ms: float, jitter: float, reply: str, seed: int = 0):
+    """
+    LangChain Runnable standing in for Groq: sleeps a log-normally jittered
+    latency around `mean_ms`, then returns `reply` as a chat message.
+    """
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def respond(_prompt):
+        with lock:
+            delay_ms = rng.lognormvariate(math.log(mean_ms), jitter) if jitter > 0 and mean_ms > 0 else mean_ms
+        time.sleep(delay_ms / 1000)
+        return AIMessage(content=reply)
+
+    return RunnableLambda(respond)
+
+
+# ----------------------------
+# Resource Sampling
+# ----------------------------
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # Peak rather than current RSS where /proc is unavailable (macOS reports bytes)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ResourceSampler:
+    """
+    Samples process CPU utilisation (100 = one full core) and RSS on a background thread.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self.samples = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List[Dict[str, float]]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self):
+        start = last_wall = time.perf_counter()
+        times = os.times()
+        last_cpu = times.user + times.system
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            times = os.times()
+            cpu = times.user + times.system
+            self.samples.append({
+                "t": round(now - start, 3),
+                "cpu_percent": round(100 * (cpu - last_cpu) / (now - last_wall), 1),
+                "rss_mb": round(_rss_bytes() / 2**20, 1),
+            })
+            last_wall, last_cpu = now, cpu
+
+
+# ----------------------------
+# Load Generation
+# ----------------------------
+def _ms_stats(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    arr = np.asarray(values) * 1000
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "mean": round(float(arr.mean()), 2),
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "max": round(float(arr.max()), 2),
+    }
+
+
+def run_level(records: List[Dict], concurrency: int, num_requests: int, rate: float, vector_store, embedder,
+              query_kwargs: Dict, sampler: ResourceSampler, seed: int = 0) -> Dict:
+    """
+    Issue `num_requests` queries (cycling through `records`) at the given concurrency and summarise them.
+    """
+    results = []
+    results_lock = threading.Lock()
+
+    def one(record: Dict, scheduled: float):
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        error = None
+        try:
+            answer, _, _ = pipeline.process_query(
+                record["question"], vector_store, embedder,
+                ground_truth=record.get("ground_truth", ""), timings=timings, **query_kwargs
+            )
+            if answer.startswith(LLM_ERROR_PREFIXES):
+                error = answer
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+        with results_lock:
+            results.append({
+                "latency": finished - scheduled,
+                "queued": started - scheduled,
+                "timings": timings,
+                "error": error,
+            })
+
+    sampler.start()
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate > 0:
+            # Open loop: arrivals follow a Poisson process regardless of how fast we serve them
+            rng = random.Random(seed)
+            arrival = begin
+            for i in range(num_requests):
+                arrival += rng.expovariate(rate)
+                delay = arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, records[i % len(records)], arrival)
+        else:
+            # Closed loop: `concurrency` users, each sending its next request as soon as one returns
+            counter = iter(range(num_requests))
+            counter_lock = threading.Lock()
+
+            def user():
+                while True:
+                    with counter_lock:
+                        i = next(counter, None)
+                    if i is None:
+                        return
+                    one(records[i % len(records)], time.perf_counter())
+
+            for _ in range(concurrency):
+                pool.submit(user)
+    elapsed = time.perf_counter() - begin
+    samples = sampler.stop()
+
+    ok = [r for r in results if r["error"] is None]
+    errors = [r["error"] for r in results if r["error"] is not None]
+    return {
+        "concurrency": concurrency,
+        "rate": rate or None,
+        "requests": len(results),
+        "errors": len(errors),
+        "error_examples": sorted(set(errors))[:5],
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": _ms_stats([r["latency"] for r in ok]),
+        "queued_ms": _ms_stats([r["queued"] for r in ok]),
+        "stages_ms": {
+            stage: _ms_stats([r["timings"][stage] for r in ok if stage in r["timings"]]) for stage in STAGES
+        },
+        "resources": {
+            "cpu_percent_mean": round(float(np.mean([s["cpu_percent"] for s in samples])), 1) if samples else None,
+            "cpu_percent_max": max((s["cpu_percent"] for s in samples), default=None),
+            "rss_mb_max": max((s["rss_mb"] for s in samples), default=None),
+            "timeline": samples,
+        },
+        "llm_scheduler": get_scheduler().stats(),
+    }
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(levels: List[Dict]):
+    print(f"\n{'conc':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err':>6}{'cpu%':>7}{'rss MB':>9}"
+          + "".join(f"{s + ' p50':>14}" for s in STAGES))
+    for level in levels:
+        lat, res = level["latency_ms"], level["resources"]
+        stages = "".join(f"{level['stages_ms'][s].get('p50', float('nan')):>14.1f}" for s in STAGES)
+        print(f"{level['concurrency']:>5}{level['throughput_rps']:>9.2f}{lat.get('p50', float('nan')):>10.1f}"
+              f"{lat.get('p95', float('nan')):>10.1f}{lat.get('p99', float('nan')):>10.1f}{level['errors']:>6}"
+              f"{res['cpu_percent_mean'] or 0:>7.0f}{res['rss_mb_max'] or 0:>9.0f}{stages}")
+
+
+def print_comparison(levels: List[Dict], baseline_path: str):
+    with open(baseline_path) as f:
+        old_report = json.load(f)
+    baseline = {(level["concurrency"], level["rate"]): level for level in old_report["levels"]}
+
+    print(f"\nvs. {baseline_path} (revision {old_report.get('revision') or '?'})")
+    print(f"{'conc':>5}{'rps Δ%':>10}{'p50 Δ%':>10}{'p95 Δ%':>10}{'p99 Δ%':>10}")
+
+    def delta(new, old):
+        return f"{100 * (new - old) / old:>+10.1f}" if old else f"{'n/a':>10}"
+
+    for level in levels:
+        old = baseline.get((level["concurrency"], level["rate"]))
+        if old is None:
+            continue
+        row = delta(level["throughput_rps"], old["throughput_rps"])
+        for key in ("p50", "p95", "p99"):
+            row += delta(level["latency_ms"].get(key, 0), old["latency_ms"].get(key, 0))
+        print(f"{level['concurrency']:>5}{row}")
+
+
+# ----------------------------
+# Entry Point
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    corpus = parser.add_mutually_exclusive_group(required=True)
+    corpus.add_argument("--index-path", help="Saved index to load (see `python -m rag_enginex ingest`).")
+    corpus.add_argument("--pdf", nargs="+", help="PDF(s) to index in-process before the run.")
+    parser.add_argument("--questions", help="Questions file (.jsonl/.csv); defaults to a small built-in set.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrival rate (req/s); 0 = closed loop.")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Mean stub LLM latency.")
+    parser.add_argument("--llm-jitter", type=float, default=0.3, help="Log-normal sigma of the stub latency.")
+    parser.add_argument("--rpm", type=float, default=1e9, help="Scheduler requests/min (default: unthrottled).")
+    parser.add_argument("--tpm", type=float, default=1e12, help="Scheduler tokens/min (default: unthrottled).")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rerank-top-n", type=int, default=3)
+    parser.add_argument("--no-rerank", action="store_true")
+    parser.add_argument("--retrieval-mode", choices=["hybrid", "dense", "lexical"], default="hybrid")
+    parser.add_argument("--evaluate", action="store_true", help="Also run evaluation (needs ground_truth in questions).")
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default="load_report.json")
+    parser.add_argument("--compare", help="Earlier report to print deltas against.")
+    args = parser.parse_args()
+
+    llm_answer.use_llm(make_stub_llm(args.llm_latency_ms, args.llm_jitter, "Stub answer.", args.seed))
+    evaluator.use_llm(make_stub_llm(args.llm_latency_ms, args.llm_jitter, "4", args.seed + 1))
+    set_scheduler(LLMScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm))
+
+    if args.index_path:
+        vector_store, embedder = pipeline.load_index(args.index_path)
+    else:
+        _, _, vector_store, embedder = pipeline.build_index(args.pdf)
+
+    if args.questions:
+        records = list(read_questions(args.questions))
+    else:
+        records = [{"question": q, "ground_truth": ""} for q in DEFAULT_QUESTIONS]
+    query_kwargs = {
+        "top_k": args.top_k,
+        "rerank_top_n": args.rerank_top_n,
+        "use_reranker": not args.no_rerank,
+        "run_evaluation": args.evaluate,
+        "retrieval_mode": args.retrieval_mode,
+    }
+    # Warm-up: load the models that are initialised lazily on the first query
+    pipeline.process_query(records[0]["question"], vector_store, embedder,
+                           ground_truth=records[0].get("ground_truth", ""), **query_kwargs)
+
+    sampler = ResourceSampler(args.sample_interval)
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            set_scheduler(LLMScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm))
+            print(f"▶ concurrency={concurrency} requests={args.requests}" + (f" rate={args.rate}/s" if args.rate else ""))
+            levels.append(run_level(records, concurrency, args.requests, args.rate, vector_store, embedder,
+                                    query_kwargs, sampler, seed=args.seed))
+    finally:
+        if hasattr(vector_store, "close"):
+            vector_store.close()
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "levels": levels,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_summary(levels)
+    if args.compare:
+        print_comparison(levels, args.compare)
+    print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,6 @@
-import os
-os.environ["TOKENIZERS_PARALLELISM"] = "false"
+"""
+RAG-EngineX: modular retrieval-augmented generation pipeline.
+
+Importing the package (or any submodule) has no side effects: models, API
+clients and configuration are resolved on first use.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from rag_enginex.cli import main
+
+sys.exit(main())
@@ -1,12 +1,12 @@
-from sentence_transformers import CrossEncoder
 import logging
 
-logging.basicConfig(level=logging.INFO, format="📝 [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 class ARESScorer:
     def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
         logger.info(f"📦 Loading ARES model: {model_name}")
+        from sentence_transformers import CrossEncoder
+
         self.model = CrossEncoder(model_name)
 
     def score(self, question: str, answer: str, contexts: list[str]) -> float:
@@ -0,0 +1,315 @@
+"""
+Headless batch CLI for RAG-EngineX.
+
+    python -m rag_enginex ingest docs/*.pdf --index-path faiss_index
+    python -m rag_enginex query questions.jsonl --index-path faiss_index --output answers.jsonl
+
+`query` reads questions from JSONL (one object per line) or CSV (with a header
+row). Each record needs a "question" field and may carry an "id" and a
+"ground_truth". Answers are appended to the output JSONL as they complete, one
+record per question; failures go to `<output>.errors.jsonl` instead. On
+restart, questions already answered in the output file are skipped and failed
+ones are retried, so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+LLM_ERROR_PREFIXES = ("[LangChain Groq Error]", "[Groq Direct Error]")
+
+
+# ----------------------------
+# Input / Output Helpers
+# ----------------------------
+def expand_pdf_paths(paths: List[str]) -> List[str]:
+    """
+    Expand directories into the PDFs they contain; keep files as given.
+    """
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith(".pdf")
+            )
+        elif os.path.exists(path):
+            pdfs.append(path)
+        else:
+            raise FileNotFoundError(f"PDF not found: {path}")
+    return pdfs
+
+
+def read_questions(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream question records from a JSONL or CSV file.
+
+    Records without an "id" get their 1-based row number, which stays stable
+    across runs as long as the input file is unchanged. Rows that are not
+    valid JSON objects or have no question are logged and skipped. A UTF-8
+    BOM (as written by Excel) is ignored.
+    """
+    is_csv = path.lower().endswith(".csv")
+    with open(path, newline="" if is_csv else None, encoding="utf-8-sig") as f:
+        rows = csv.DictReader(f) if is_csv else (line for line in f if line.strip())
+        for row_number, row in enumerate(rows, start=1):
+            if not is_csv:
+                try:
+                    row = json.loads(row)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping row {row_number}: invalid JSON ({e}).")
+                    continue
+                if not isinstance(row, dict):
+                    logger.warning(f"Skipping row {row_number}: expected a JSON object, got {type(row).__name__}.")
+                    continue
+
+            question = str(row.get("question") or "").strip()
+            if not question:
+                logger.warning(f"Skipping row {row_number}: no question.")
+                continue
+            yield {
+                "id": str(row.get("id") or row_number),
+                "question": question,
+                "ground_truth": str(row.get("ground_truth") or ""),
+            }
+
+
+def errors_path(output_path: str) -> str:
+    """
+    Where failed records of a run are written: answers.jsonl -> answers.errors.jsonl.
+    """
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.errors{ext or '.jsonl'}"
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """
+    Return ids already answered in `output_path`, and repair the file for appending.
+
+    A run killed mid-write can leave a partial final line; it is truncated so
+    that appended records start on a fresh line. Error records (written to the
+    output by older versions) are dropped, so the retried questions end up
+    with exactly one record each.
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[: data.rfind(b"\n") + 1]
+
+    lines = [line for line in data.decode("utf-8").splitlines() if line.strip()]
+    done = set()
+    kept = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            kept.append(line)
+            continue
+        if isinstance(record, dict) and "error" in record:
+            continue
+        kept.append(line)
+        if isinstance(record, dict):
+            done.add(str(record.get("id")))
+
+    if len(kept) < len(lines):
+        tmp = f"{output_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in kept))
+        os.replace(tmp, output_path)
+    return done
+
+
+def batched(records: Iterator[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ----------------------------
+# Subcommands
+# ----------------------------
+def run_ingest(args: argparse.Namespace) -> int:
+    from rag_enginex.pipeline import build_index, embed_corpus, load_chunks
+
+    pdf_paths = expand_pdf_paths(args.pdfs)
+    if not pdf_paths:
+        logger.error("No PDFs found.")
+        return 1
+
+    logger.info(f"📄 Ingesting {len(pdf_paths)} PDF(s)...")
+    if args.shards > 1:
+        from rag_enginex.sharded_store import write_shards
+
+        # Shards are written straight from the embedding matrix; no unsharded index is built
+        chunks = load_chunks(pdf_paths, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        embeddings = embed_corpus(chunks, embed_workers=args.embed_workers)
+        paths = write_shards(embeddings, chunks, args.shards, args.index_path)
+        logger.info(f"✅ Indexed {len(chunks)} chunks into {len(paths)} shards under {args.index_path}")
+        return 0
+
+    chunks, _, vector_store, _ = build_index(
+        pdf_paths,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        embed_workers=args.embed_workers,
+        index_path=args.index_path,
+    )
+
+    # A stale manifest would make load_index treat this folder as sharded
+    from rag_enginex.sharded_store import MANIFEST_FILE
+
+    manifest_file = os.path.join(args.index_path, MANIFEST_FILE)
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+    vector_store.save()
+    logger.info(f"✅ Indexed {len(chunks)} chunks into {args.index_path}")
+    return 0
+
+
+def answer_one(record: Dict[str, str], vector_store, embedder, args: argparse.Namespace) -> Dict:
+    from rag_enginex.pipeline import process_query
+
+    result: Dict = {"id": record["id"], "question": record["question"]}
+    try:
+        answer, contexts, scores = process_query(
+            question=record["question"],
+            vector_store=vector_store,
+            embedder=embedder,
+            top_k=args.top_k,
+            rerank_top_n=args.rerank_top_n,
+            use_reranker=not args.no_rerank,
+            run_evaluation=args.evaluate,
+            ground_truth=record["ground_truth"],
+            retrieval_mode=args.retrieval_mode,
+        )
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    # generate_answer reports LLM failures as text; record them as errors so they are retried
+    if answer.startswith(LLM_ERROR_PREFIXES):
+        result["error"] = answer
+        return result
+
+    result["answer"] = answer
+    result["contexts"] = contexts
+    if args.evaluate:
+        result["scores"] = {k: v for k, v in scores.items() if k not in ("question", "answer")}
+    return result
+
+
+def run_query(args: argparse.Namespace) -> int:
+    from rag_enginex.pipeline import load_index
+
+    done = completed_ids(args.output) if not args.overwrite else set()
+    if done:
+        logger.info(f"↩️  Resuming: {len(done)} question(s) already answered in {args.output}")
+
+    vector_store, embedder = load_index(args.index_path)
+    try:
+        return _answer_all(args, done, vector_store, embedder)
+    finally:
+        if hasattr(vector_store, "close"):
+            vector_store.close()
+
+
+def _answer_all(args: argparse.Namespace, done: Set[str], vector_store, embedder) -> int:
+    from rag_enginex.llm_scheduler import get_scheduler
+
+    pending = (r for r in read_questions(args.input) if r["id"] not in done)
+    answered = failed = 0
+    mode = "w" if args.overwrite else "a"
+
+    # Answers are appended across runs; failures only describe the latest run and
+    # are retried on resume, so they go to a separate file that is started afresh
+    with open(args.output, mode, encoding="utf-8") as out, \
+            open(errors_path(args.output), "w", encoding="utf-8") as errors, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for batch in batched(pending, args.batch_size):
+            futures = [pool.submit(answer_one, record, vector_store, embedder, args) for record in batch]
+            for future in as_completed(futures):
+                result = future.result()
+                target = errors if "error" in result else out
+                target.write(json.dumps(result, ensure_ascii=False) + "\n")
+                target.flush()
+                if "error" in result:
+                    failed += 1
+                else:
+                    answered += 1
+            logger.info(f"🧠 {answered} answered, {failed} failed so far")
+
+    logger.info(f"✅ Done: {answered} answered, {failed} failed → {args.output}")
+    if failed:
+        logger.info(f"⚠️  Failed questions written to {errors_path(args.output)}; re-run to retry them")
+    logger.info(f"📈 Groq scheduler: {json.dumps(get_scheduler().stats())}")
+    return 1 if failed else 0
+
+
+# ----------------------------
+# Entry Point
+# ----------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="rag_enginex", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Build and save an index from PDFs.")
+    ingest.add_argument("pdfs", nargs="+", help="PDF files or directories containing PDFs.")
+    ingest.add_argument("--index-path", default="faiss_index")
+    ingest.add_argument("--chunk-size", type=int, default=800)
+    ingest.add_argument("--chunk-overlap", type=int, default=100)
+    ingest.add_argument("--embed-workers", type=int, default=1,
+                        help="Embedding worker processes (>1 enables sharded embedding).")
+    ingest.add_argument("--shards", type=int, default=1,
+                        help="Split the index into this many shards served by separate processes at query time.")
+    ingest.set_defaults(func=run_ingest)
+
+    query = subparsers.add_parser("query", help="Answer questions from JSONL/CSV into JSONL.")
+    query.add_argument("input", help="Questions file (.jsonl or .csv).")
+    query.add_argument("--output", required=True,
+                       help="Output JSONL (appended to; resumable). Failures go to <output>.errors.jsonl.")
+    query.add_argument("--index-path", default="faiss_index")
+    query.add_argument("--top-k", type=int, default=5)
+    query.add_argument("--rerank-top-n", type=int, default=3)
+    query.add_argument("--retrieval-mode", choices=["hybrid", "dense", "lexical"], default="hybrid")
+    query.add_argument("--no-rerank", action="store_true", help="Skip the cross-encoder reranker.")
+    query.add_argument("--evaluate", action="store_true",
+                       help="Score answers against each record's ground_truth.")
+    query.add_argument("--concurrency", type=int, default=4, help="Questions answered in parallel.")
+    query.add_argument("--batch-size", type=int, default=64, help="Questions read and scheduled per batch.")
+    query.add_argument("--overwrite", action="store_true", help="Start over instead of resuming.")
+    query.set_defaults(func=run_query)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "concurrency", 1) <= 0 or getattr(args, "batch_size", 1) <= 0:
+        print("--concurrency and --batch-size must be positive.", file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.INFO, format="📝 [%(levelname)s] %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
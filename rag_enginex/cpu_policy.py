@@ -0,0 +1,169 @@
+"""
+CPU execution policy for RAG-EngineX.
+
+Controls how many threads torch uses inside (intra-op) and across (inter-op)
+operators, whether HuggingFace tokenizers run in parallel, and how the
+available cores are split into groups for sharded embedding workers.
+
+Every setting can be overridden through environment variables:
+
+    RAG_INTRA_OP_THREADS   -> torch.set_num_threads
+    RAG_INTER_OP_THREADS   -> torch.set_num_interop_threads
+    RAG_TOKENIZERS_PARALLELISM ("true"/"false"; if unset, an exported
+                               TOKENIZERS_PARALLELISM is left as is, else "false")
+"""
+
+import os
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def available_cores() -> List[int]:
+    """
+    Return the CPU ids this process is allowed to run on.
+
+    Uses the scheduler affinity mask where the platform exposes it (Linux),
+    so container CPU limits set via cpusets are respected.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_groups(num_groups: int, cores: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    Split the available cores into `num_groups` contiguous, near-equal groups.
+
+    Args:
+        num_groups (int): Number of groups (one per worker process).
+        cores (List[int], optional): Core ids to split. Defaults to available_cores().
+
+    Returns:
+        List[List[int]]: Core ids for each group. Never returns an empty group.
+    """
+    cores = cores if cores is not None else available_cores()
+    if num_groups <= 0:
+        raise ValueError("num_groups must be a positive integer.")
+    num_groups = min(num_groups, len(cores))
+
+    base, extra = divmod(len(cores), num_groups)
+    groups = []
+    start = 0
+    for i in range(num_groups):
+        size = base + (1 if i < extra else 0)
+        groups.append(cores[start:start + size])
+        start += size
+    return groups
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}.")
+
+
+class CPUPolicy:
+    """
+    Thread configuration for torch and tokenizers in the current process.
+    """
+
+    def __init__(
+        self,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        tokenizers_parallelism: Optional[bool] = None,
+    ):
+        """
+        Args:
+            intra_op_threads (int, optional): Threads used inside a single op.
+                None keeps torch's default (all visible cores).
+            inter_op_threads (int, optional): Threads used to run independent ops
+                concurrently. None keeps torch's default.
+            tokenizers_parallelism (bool, optional): Let the Rust tokenizers use
+                their own thread pool. Keep this off when torch already uses every
+                core or when the process forks workers. None respects a
+                TOKENIZERS_PARALLELISM the user exported and defaults to off.
+        """
+        if intra_op_threads is not None and intra_op_threads <= 0:
+            raise ValueError("intra_op_threads must be a positive integer.")
+        if inter_op_threads is not None and inter_op_threads <= 0:
+            raise ValueError("inter_op_threads must be a positive integer.")
+
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.tokenizers_parallelism = tokenizers_parallelism
+
+    @classmethod
+    def from_env(cls) -> "CPUPolicy":
+        """
+        Build a policy from the RAG_* environment variables.
+        """
+        parallelism = os.environ.get("RAG_TOKENIZERS_PARALLELISM", "").strip().lower()
+        return cls(
+            intra_op_threads=_env_int("RAG_INTRA_OP_THREADS"),
+            inter_op_threads=_env_int("RAG_INTER_OP_THREADS"),
+            tokenizers_parallelism=parallelism in ("1", "true", "yes") if parallelism else None,
+        )
+
+    def for_worker(self, cores: List[int]) -> "CPUPolicy":
+        """
+        Derive the policy for a worker pinned to `cores`.
+
+        Intra-op threads default to the size of the core group and are capped
+        at it, so a process-wide RAG_INTRA_OP_THREADS (sized for one process
+        using the whole machine) does not make workers oversubscribe each
+        other; inter-op parallelism defaults to 1, also capped at the group
+        size, because each worker runs a single encode call at a time.
+        """
+        return CPUPolicy(
+            intra_op_threads=min(self.intra_op_threads or len(cores), len(cores)),
+            inter_op_threads=min(self.inter_op_threads or 1, len(cores)),
+            tokenizers_parallelism=self.tokenizers_parallelism,
+        )
+
+    def apply(self) -> None:
+        """
+        Apply the policy to the current process.
+
+        Must run before the first torch operation; torch refuses to change the
+        inter-op pool once it has been used, in which case a warning is logged
+        and the existing setting is kept.
+        """
+        if self.tokenizers_parallelism is None:
+            os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        else:
+            os.environ["TOKENIZERS_PARALLELISM"] = "true" if self.tokenizers_parallelism else "false"
+
+        if self.intra_op_threads is None and self.inter_op_threads is None:
+            return
+
+        import torch
+
+        if self.intra_op_threads is not None:
+            torch.set_num_threads(self.intra_op_threads)
+        if self.inter_op_threads is not None:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError as e:
+                logger.warning(f"Could not set inter-op threads to {self.inter_op_threads}: {e}")
+
+    def __repr__(self) -> str:
+        return (
+            f"CPUPolicy(intra_op_threads={self.intra_op_threads}, "
+            f"inter_op_threads={self.inter_op_threads}, "
+            f"tokenizers_parallelism={self.tokenizers_parallelism})"
+        )
+
+
+def pin_to_cores(cores: List[int]) -> None:
+    """
+    Restrict the current process to `cores`. No-op where affinity is unsupported.
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(cores))
@@ -1,26 +1,280 @@
 
-from sentence_transformers import SentenceTransformer
-from typing import List
+import multiprocessing as mp
+import queue
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from rag_enginex.cpu_policy import CPUPolicy, core_groups, available_cores, pin_to_cores
 
 class BGEEmbedder:
     """
     Embedder using BAAI/bge-base-en model for dense retrieval.
     """
 
-    def __init__(self, model_name: str = "BAAI/bge-base-en"):
+    def __init__(self, model_name: str = "BAAI/bge-base-en", policy: Optional[CPUPolicy] = None):
         """
-        Initialize the SentenceTransformer model.
+        Configure the embedder; the SentenceTransformer model is loaded on first use.
+
+        Args:
+            model_name (str): HuggingFace model id.
+            policy (CPUPolicy, optional): Thread policy applied before the model
+                is loaded. Defaults to CPUPolicy.from_env().
         """
-        self.model = SentenceTransformer(model_name)
+        self.policy = policy or CPUPolicy.from_env()
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
 
-    def embed_chunks(self, chunks: List[str]) -> List[List[float]]:
+    @property
+    def model(self):
+        """
+        The SentenceTransformer, loaded (after applying the thread policy) on first access.
+
+        Lazy so that code which only needs model_name, e.g. bulk ingestion with a
+        ShardedEmbedder, does not load a model copy in the parent process.
+        """
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self.policy.apply()
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, chunks: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Embed a list of text chunks into a single float32 matrix.
+
+        The encoder output is returned as-is (no per-vector Python lists), so it
+        can be handed straight to FAISSVectorestore.add_embeddings.
+
+        Args:
+            chunks (List[str]): List of text chunks.
+            batch_size (int): Chunks per forward pass.
+
+        Returns:
+            np.ndarray: C-contiguous float32 array of shape (len(chunks), dim).
+        """
+        if not chunks:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        vectors = self.model.encode(
+            chunks, batch_size=batch_size, show_progress_bar=len(chunks) > batch_size, convert_to_numpy=True
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def embed_chunks(self, chunks: List[str], batch_size: int = 32) -> List[List[float]]:
         """
         Embed a list of text chunks.
 
+        List-returning wrapper around embed(), kept for backward compatibility.
+
         Args:
             chunks (List[str]): List of text chunks.
+            batch_size (int): Chunks per forward pass.
 
         Returns:
             List[List[float]]: List of embedding vectors.
         """
-        return self.model.encode(chunks, show_progress_bar=True, convert_to_numpy=True).tolist()
+        return self.embed(chunks, batch_size=batch_size).tolist()
+
+
+def _shard_worker(model_name, cores, policy, batch_size, tasks, results):
+    """
+    Worker loop: pin to `cores`, load the model once, embed tasks until a None sentinel.
+    """
+    pin_to_cores(cores)
+    policy.for_worker(cores).apply()
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name)
+    except Exception as e:
+        results.put((None, f"model load failed on cores {cores}: {e}"))
+        return
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, texts = task
+        try:
+            vectors = model.encode(
+                texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True
+            )
+            # No copy when the encoder already returns float32 (the usual case)
+            vectors = np.asarray(vectors, dtype=np.float32)
+            results.put((task_id, vectors))
+        except Exception as e:
+            results.put((task_id, f"encode failed: {e}"))
+
+
+class ShardedEmbedder:
+    """
+    Multi-process embedder for bulk ingestion.
+
+    Splits the allowed cores into `num_workers` groups and starts one worker
+    process per group, pinned to its cores and running its own copy of the
+    model with intra-op threads equal to the group size. Chunks are fed to
+    the workers in tasks of `task_size` through a shared queue, so faster
+    workers pick up more work, and the results are reassembled in input order.
+
+    Use as a context manager so the workers are shut down afterwards:
+
+        with ShardedEmbedder(num_workers=8) as embedder:
+            embeddings = embedder.embed(chunks)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-base-en",
+        num_workers: Optional[int] = None,
+        policy: Optional[CPUPolicy] = None,
+        batch_size: int = 32,
+        task_size: int = 256,
+        stall_timeout: Optional[float] = 600.0,
+    ):
+        """
+        Args:
+            model_name (str): HuggingFace model id.
+            num_workers (int, optional): Worker processes. Defaults to one per
+                4 available cores.
+            policy (CPUPolicy, optional): Base thread policy; each worker derives
+                its own via CPUPolicy.for_worker. Defaults to CPUPolicy.from_env().
+            batch_size (int): Chunks per forward pass inside a worker.
+            task_size (int): Chunks handed to a worker at a time.
+            stall_timeout (float, optional): Backstop for embed(): give up if no
+                task completes for this many seconds. None waits indefinitely.
+        """
+        if task_size <= 0:
+            raise ValueError("task_size must be a positive integer.")
+
+        self.model_name = model_name
+        self.policy = policy or CPUPolicy.from_env()
+        self.batch_size = batch_size
+        self.task_size = task_size
+        self.stall_timeout = stall_timeout
+        self.groups = core_groups(num_workers or max(1, len(available_cores()) // 4))
+        self._workers = []
+        self._tasks = None
+        self._results = None
+
+    def start(self):
+        """
+        Spawn the worker processes. Called automatically by embed.
+        """
+        if self._workers:
+            return
+        # "spawn" avoids inheriting an already-initialised torch thread pool
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        for cores in self.groups:
+            worker = ctx.Process(
+                target=_shard_worker,
+                args=(self.model_name, cores, self.policy, self.batch_size, self._tasks, self._results),
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def close(self):
+        """
+        Stop all worker processes.
+        """
+        if not self._workers:
+            return
+        for _ in self._workers:
+            self._tasks.put(None)  # type: ignore
+        for worker in self._workers:
+            worker.join(timeout=30)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def embed(self, chunks: List[str]) -> np.ndarray:
+        """
+        Embed a list of text chunks across all workers.
+
+        Worker results are written straight into one preallocated float32 matrix.
+        If a worker dies mid-run (e.g. OOM-killed), its task is lost, so the call
+        fails and the pool is torn down rather than waiting for it forever.
+
+        Args:
+            chunks (List[str]): List of text chunks.
+
+        Returns:
+            np.ndarray: C-contiguous float32 array of shape (len(chunks), dim),
+                rows in the same order as `chunks`.
+
+        Raises:
+            RuntimeError: If a worker fails or exits before all tasks are done.
+            TimeoutError: If no task completes within `stall_timeout` seconds.
+        """
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+        self.start()
+
+        num_tasks = 0
+        for start in range(0, len(chunks), self.task_size):
+            self._tasks.put((num_tasks, chunks[start:start + self.task_size]))  # type: ignore
+            num_tasks += 1
+
+        out = None
+        received = 0
+        last_progress = time.monotonic()
+        try:
+            while received < num_tasks:
+                try:
+                    task_id, payload = self._results.get(timeout=1.0)  # type: ignore
+                except queue.Empty:
+                    # Workers only exit on the shutdown sentinel, so any exit now means lost tasks
+                    dead = [w for w in self._workers if w.exitcode is not None]
+                    if dead:
+                        codes = ", ".join(f"pid {w.pid}: exit code {w.exitcode}" for w in dead)
+                        raise RuntimeError(
+                            f"{len(dead)} embedding worker(s) exited with {num_tasks - received} task(s) outstanding ({codes})."
+                        )
+                    if self.stall_timeout is not None and time.monotonic() - last_progress > self.stall_timeout:
+                        raise TimeoutError(f"No embedding task completed within {self.stall_timeout:.0f}s.")
+                    continue
+                if isinstance(payload, str):
+                    raise RuntimeError(f"Embedding worker failed: {payload}")
+                if out is None:
+                    out = np.empty((len(chunks), payload.shape[1]), dtype=np.float32)
+                start = task_id * self.task_size
+                out[start:start + len(payload)] = payload
+                received += 1
+                last_progress = time.monotonic()
+        except BaseException:
+            # Leftover tasks/results would leak into the next call; drop the pool instead
+            for worker in self._workers:
+                worker.terminate()
+            self._workers = []
+            raise
+
+        return out  # type: ignore
+
+    def embed_chunks(self, chunks: List[str]) -> List[List[float]]:
+        """
+        Embed a list of text chunks across all workers.
+
+        List-returning wrapper around embed(), kept for backward compatibility.
+
+        Args:
+            chunks (List[str]): List of text chunks.
+
+        Returns:
+            List[List[float]]: Embedding vectors, in the same order as `chunks`.
+        """
+        return self.embed(chunks).tolist()
@@ -11,17 +11,24 @@ from rag_enginex.evaluator import evaluate_sample
 
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+
 # ----------------------------
 # Clean Logging Setup
 # ----------------------------
-warnings.filterwarnings("ignore", category=FutureWarning)
-os.environ["TOKENIZERS_PARALLELISM"] = "false"
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="📝 [%(levelname)s] %(message)s"
-)
-logger = logging.getLogger(__name__)
+def configure_logging() -> None:
+    """
+    Quiet warnings and set up console logging. Called by script entry points only,
+    so importing this module leaves the caller's logging untouched.
+    """
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="📝 [%(levelname)s] %(message)s"
+    )
 
 # ----------------------------
 # Try Rich Table Display (optional)
@@ -55,9 +62,9 @@ def prepare_eval_dataframe(
 
     logger.info("🔐 Embedding chunks...")
     embedder = BGEEmbedder()
-    chunk_embeddings = embedder.embed_chunks(chunks)
+    chunk_embeddings = embedder.embed(chunks)
 
-    dim = len(chunk_embeddings[0])
+    dim = chunk_embeddings.shape[1]
     vector_store = FAISSVectorestore(dim=dim)
     vector_store.add_embeddings(chunk_embeddings, chunks)
 
@@ -67,7 +74,7 @@ def prepare_eval_dataframe(
 
     for idx, (question, ground_truth) in enumerate(zip(questions, ground_truths)):
         logger.info(f"❓ Q{idx + 1}: {question}")
-        query_embedding = embedder.embed_chunks([question])[0]
+        query_embedding = embedder.embed([question])[0]
         retrieved = vector_store.search(query_embedding, top_k=top_k)
         top_chunks = [chunk for chunk, _ in retrieved]
 
@@ -125,6 +132,8 @@ def display_results(df: pd.DataFrame) -> None:
 # Main Execution
 # ----------------------------
 if __name__ == "__main__":
+    configure_logging()
+
     questions = [
         "What is the main idea of the document?",
         "What technologies has Rahul worked with?",
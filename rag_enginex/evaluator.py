@@ -1,39 +1,89 @@
 from typing import List, Dict, Union
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 from rag_enginex.llm_wrapper import get_groq_llm
+from rag_enginex.llm_scheduler import PRIORITY_EVALUATION, estimate_tokens, get_scheduler
 from rag_enginex.ares import ARESScorer
 
 import numpy as np
 import logging
+import threading
 
 # ----------------------------
 # Setup
 # ----------------------------
-_embedder = SentenceTransformer("BAAI/bge-base-en-v1.5")
+# Models and the LLM client are created on first use, not at import time.
+_embedder = None
+_llm = None
+_ares_scorer = None
+_lock = threading.Lock()
 _logger = logging.getLogger(__name__)
-_llm = get_groq_llm()
+
+
+def _get_embedder():
+    global _embedder
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                from sentence_transformers import SentenceTransformer
+                _embedder = SentenceTransformer("BAAI/bge-base-en-v1.5")
+    return _embedder
+
+
+def _get_llm():
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                _llm = get_groq_llm()
+    return _llm
+
+
+def use_llm(llm):
+    """
+    Replace the LLM used for faithfulness scoring (e.g. with a local stub).
+    """
+    global _llm
+    with _lock:
+        _llm = llm
+
+
+def _get_ares_scorer() -> ARESScorer:
+    global _ares_scorer
+    if _ares_scorer is None:
+        with _lock:
+            if _ares_scorer is None:
+                _ares_scorer = ARESScorer()
+    return _ares_scorer
 
 # ----------------------------
 # Embedding Helpers
 # ----------------------------
-def compute_embedding(text: str) -> np.ndarray:
+def compute_embeddings(texts: List[str]) -> np.ndarray:
+    """
+    Embed several texts in one encoder call; returns a float32 (len(texts), dim) array.
+    """
+    embedder = _get_embedder()
     try:
-        return _embedder.encode(text, convert_to_numpy=True)
+        vectors = embedder.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
     except Exception as e:
-        _logger.error(f"Embedding failed for text: {text[:50]}... | {e}")
-        dim = _embedder.get_sentence_embedding_dimension() or 768
-        return np.zeros((dim,))
+        _logger.error(f"Embedding failed for text: {texts[0][:50] if texts else ''}... | {e}")
+        dim = embedder.get_sentence_embedding_dimension() or 768
+        return np.zeros((len(texts), dim), dtype=np.float32)
+
+
+def compute_embedding(text: str) -> np.ndarray:
+    return compute_embeddings([text])[0]
 
 
 # ----------------------------
 # Metric 1: Answer Relevance
 # ----------------------------
 def score_answer_relevance(answer: str, ground_truth: str) -> float:
-    a_emb = compute_embedding(answer).reshape(1, -1)
-    gt_emb = compute_embedding(ground_truth).reshape(1, -1)
-    score = cosine_similarity(a_emb, gt_emb)[0][0]
-    return round(float(score), 4)
+    a_emb, gt_emb = compute_embeddings([answer, ground_truth])
+    norm = float(np.linalg.norm(a_emb) * np.linalg.norm(gt_emb))
+    # Zero vectors (failed embeddings) score 0, matching sklearn's cosine_similarity
+    score = float(a_emb @ gt_emb) / norm if norm else 0.0
+    return round(score, 4)
 
 
 # ----------------------------
@@ -56,7 +106,12 @@ Just output a number from 1 to 5.
 Score:"""
 
     try:
-        response = _llm.invoke(prompt)
+        # Evaluation yields to user-facing answers and queues (up to its deadline) under quota pressure
+        response = get_scheduler().call(
+            lambda: _get_llm().invoke(prompt),
+            tokens=estimate_tokens(prompt, max_output_tokens=16),
+            priority=PRIORITY_EVALUATION,
+        )
         score_str = getattr(response, "content", str(response)).strip().split()[0]
         score = float(score_str)
         return round(min(max(score, 1.0), 5.0), 2)
@@ -70,7 +125,7 @@ Score:"""
 # ----------------------------
 def score_with_ares(question: str, answer: str, contexts: List[str]) -> float:
     try:
-        scorer = ARESScorer()
+        scorer = _get_ares_scorer()
         return round(scorer.score(question, answer, contexts), 4)
     except Exception as e:
         _logger.warning(f"ARES scoring failed: {e}")
@@ -0,0 +1,262 @@
+"""
+Lexical retrieval for RAG-EngineX: an in-process BM25 inverted index.
+
+Postings are stored in flat NumPy arrays (CSR layout: per-term offsets into a
+shared doc-id / term-frequency array), so a query is scored with a handful of
+vectorized operations instead of Python loops over documents. Document ids are
+positions in the chunk list, i.e. the same ids FAISS uses, which lets lexical
+and dense rankings be fused with reciprocal_rank_fusion.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Runs of Unicode letters/digits (so "Müller" or "東京" stay whole); keeps
+# identifiers such as "XR-200", "v1.2" or "foo_bar" as single tokens
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-_./][^\W_]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Normalise (NFKC, case-folded) and split text into BM25 terms.
+    """
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Fuse several ranked id lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: Ranked lists of document ids, best first.
+        k (int): RRF damping constant; 60 is the value from the original paper.
+
+    Returns:
+        List of (doc_id, fused_score), best first.
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of chunks with array-backed postings.
+    """
+
+    def __init__(
+        self,
+        terms: List[str],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lens: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+        collection_doc_freqs: Optional[np.ndarray] = None,
+        collection_size: Optional[int] = None,
+        collection_avg_len: Optional[float] = None,
+    ):
+        """
+        Use BM25Index.build or BM25Index.load rather than calling this directly.
+
+        Args:
+            terms (List[str]): Vocabulary; term i owns postings offsets[i]:offsets[i+1].
+            offsets (np.ndarray): int64, len(terms) + 1.
+            doc_ids (np.ndarray): int32 document id per posting.
+            term_freqs (np.ndarray): float32 term frequency per posting.
+            doc_lens (np.ndarray): float32 token count per document.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 length normalisation.
+            collection_doc_freqs, collection_size, collection_avg_len: Statistics
+                of a larger collection this index is one partition of, used for
+                idf and length normalisation instead of the index's own (see
+                share_collection_stats).
+        """
+        self.terms = terms
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lens = doc_lens
+        self.k1 = k1
+        self.b = b
+        self.collection_doc_freqs = collection_doc_freqs
+        self.collection_size = collection_size
+        self.collection_avg_len = collection_avg_len
+
+        n_docs = collection_size if collection_size is not None else len(doc_lens)
+        doc_freqs = (collection_doc_freqs if collection_doc_freqs is not None else np.diff(offsets)).astype("float32")
+        self.idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype("float32")
+        if collection_avg_len is not None:
+            avg_len = collection_avg_len
+        else:
+            avg_len = float(doc_lens.mean()) if len(doc_lens) else 0.0
+        # Per-document denominator term, precomputed once instead of per query
+        self._norm = (k1 * (1 - b + b * doc_lens / avg_len)).astype("float32") if avg_len else \
+            np.full(len(doc_lens), k1, dtype="float32")
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lens)
+
+    @classmethod
+    def build(cls, chunks: List[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """
+        Build the index from text chunks; chunk i becomes document id i.
+        """
+        vocab: Dict[str, int] = {}
+        term_ids: List[int] = []
+        posting_docs: List[int] = []
+        posting_tfs: List[int] = []
+        doc_lens = np.zeros(len(chunks), dtype="float32")
+
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            doc_lens[doc_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                posting_docs.append(doc_id)
+                posting_tfs.append(tf)
+
+        term_arr = np.asarray(term_ids, dtype="int64")
+        order = np.argsort(term_arr, kind="stable")  # stable keeps doc ids ascending per term
+        offsets = np.zeros(len(vocab) + 1, dtype="int64")
+        np.cumsum(np.bincount(term_arr, minlength=len(vocab)), out=offsets[1:])
+
+        terms = [""] * len(vocab)
+        for term, i in vocab.items():
+            terms[i] = term
+
+        return cls(
+            terms=terms,
+            offsets=offsets,
+            doc_ids=np.asarray(posting_docs, dtype="int32")[order],
+            term_freqs=np.asarray(posting_tfs, dtype="float32")[order],
+            doc_lens=doc_lens,
+            k1=k1,
+            b=b,
+        )
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        BM25 score of every document for `query` (float32, length num_docs).
+        """
+        term_ids = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if not term_ids:
+            return np.zeros(self.num_docs, dtype="float32")
+
+        term_ids_arr = np.asarray(term_ids, dtype="int64")
+        starts = self.offsets[term_ids_arr]
+        lengths = self.offsets[term_ids_arr + 1] - starts
+        positions = np.concatenate([np.arange(s, s + n) for s, n in zip(starts, lengths)])
+
+        docs = self.doc_ids[positions]
+        tfs = self.term_freqs[positions]
+        idf = np.repeat(self.idf[term_ids_arr], lengths)
+
+        contrib = idf * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+        return np.bincount(docs, weights=contrib, minlength=self.num_docs).astype("float32")
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Return the top_k (doc_id, bm25_score) pairs with a positive score, best first.
+        """
+        if top_k <= 0:
+            raise ValueError("top_k must be a positive integer.")
+
+        scores = self.score(query)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ranked]
+
+    def save(self, path: str):
+        """
+        Save the index to a single .npz file (no pickle).
+        """
+        vocab_bytes = np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8)
+        collection = {}
+        if self.collection_doc_freqs is not None:
+            collection = {
+                "collection_doc_freqs": self.collection_doc_freqs,
+                "collection": np.array([self.collection_size, self.collection_avg_len], dtype="float64"),
+            }
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                vocab=vocab_bytes,
+                offsets=self.offsets,
+                doc_ids=self.doc_ids,
+                term_freqs=self.term_freqs,
+                doc_lens=self.doc_lens,
+                params=np.array([self.k1, self.b], dtype="float64"),
+                **collection,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """
+        Load an index written by save().
+        """
+        with np.load(path, allow_pickle=False) as data:
+            vocab_text = data["vocab"].tobytes().decode("utf-8")
+            k1, b = data["params"].tolist()
+            collection = {}
+            if "collection_doc_freqs" in data.files:
+                size, avg_len = data["collection"].tolist()
+                collection = {
+                    "collection_doc_freqs": data["collection_doc_freqs"],
+                    "collection_size": int(size),
+                    "collection_avg_len": avg_len,
+                }
+            return cls(
+                terms=vocab_text.split("\n") if vocab_text else [],
+                offsets=data["offsets"],
+                doc_ids=data["doc_ids"],
+                term_freqs=data["term_freqs"],
+                doc_lens=data["doc_lens"],
+                k1=k1,
+                b=b,
+                **collection,
+            )
+
+
+def share_collection_stats(indexes: List[BM25Index]) -> List[BM25Index]:
+    """
+    Re-base indexes over disjoint partitions of one corpus on the whole corpus' statistics.
+
+    idf and length normalisation depend on the collection, so indexes built per
+    shard would score the same document differently. The returned indexes use
+    the union's document count, document frequencies and average length, which
+    makes their scores comparable: merging their top-k lists by score gives the
+    same ranking as one index over all documents.
+    """
+    total_docs = sum(index.num_docs for index in indexes)
+    total_len = sum(float(index.doc_lens.sum()) for index in indexes)
+    doc_freqs: Counter = Counter()
+    for index in indexes:
+        doc_freqs.update(dict(zip(index.terms, np.diff(index.offsets).tolist())))
+
+    return [
+        BM25Index(
+            terms=index.terms,
+            offsets=index.offsets,
+            doc_ids=index.doc_ids,
+            term_freqs=index.term_freqs,
+            doc_lens=index.doc_lens,
+            k1=index.k1,
+            b=index.b,
+            collection_doc_freqs=np.array([doc_freqs[t] for t in index.terms], dtype="int64"),
+            collection_size=total_docs,
+            collection_avg_len=total_len / total_docs if total_docs else 0.0,
+        )
+        for index in indexes
+    ]
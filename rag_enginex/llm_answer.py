@@ -1,28 +1,49 @@
-import os
+import threading
 from typing import List
-from dotenv import load_dotenv
 from pydantic import SecretStr
-import streamlit as st
 
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI  # Groq-compatible wrapper
-import streamlit as st
-
-# === Load API Key ===
-load_dotenv()
-GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY not found in environment variables.")
+from rag_enginex.llm_wrapper import resolve_groq_api_key
+from rag_enginex.llm_scheduler import PRIORITY_INTERACTIVE, estimate_tokens, get_scheduler
 
 # === LangChain LLM (Groq using OpenAI-compatible endpoint) ===
-groq_llm = ChatOpenAI(
-    model="llama3-8b-8192",
-    api_key=SecretStr(GROQ_API_KEY),
-    base_url="https://api.groq.com/openai/v1",
-    temperature=0.2
-)
+# Built on first use so importing this module needs neither an API key nor Streamlit.
+_groq_llm = None
+_groq_rag_chain = None
+_lock = threading.Lock()
+
+
+def _get_groq_llm():
+    """
+    Return the shared Groq chat model, creating it on first call.
+    """
+    global _groq_llm
+    if _groq_llm is None:
+        with _lock:
+            if _groq_llm is None:
+                from langchain_openai import ChatOpenAI  # Groq-compatible wrapper
+
+                _groq_llm = ChatOpenAI(
+                    model="llama3-8b-8192",
+                    api_key=SecretStr(resolve_groq_api_key()),
+                    base_url="https://api.groq.com/openai/v1",
+                    temperature=0.2,
+                    max_retries=0,  # retries go through LLMScheduler.call, which respects the quota
+                )
+    return _groq_llm
+
+
+def use_llm(llm):
+    """
+    Replace the Groq chat model used for answers, e.g. with a local stub for
+    offline load tests. Any LangChain Runnable returning a message or string works.
+    """
+    global _groq_llm, _groq_rag_chain
+    with _lock:
+        _groq_llm = llm
+        _groq_rag_chain = None
 
 # === RAG Prompt Template ===
 prompt_template = PromptTemplate(
@@ -41,27 +62,40 @@ Answer:"""
 )
 
 # === LangChain RAG Chain (Groq) ===
-groq_rag_chain = (
-    RunnablePassthrough.assign(context=lambda x: "\n\n".join(x["context_chunks"]))
-    | prompt_template
-    | groq_llm
-    | StrOutputParser()
-)
+def _get_groq_rag_chain():
+    """
+    Return the shared RAG chain, creating it on first call.
+    """
+    global _groq_rag_chain
+    if _groq_rag_chain is None:
+        llm = _get_groq_llm()
+        with _lock:
+            if _groq_rag_chain is None:
+                _groq_rag_chain = (
+                    RunnablePassthrough.assign(context=lambda x: "\n\n".join(x["context_chunks"]))
+                    | prompt_template
+                    | llm
+                    | StrOutputParser()
+                )
+    return _groq_rag_chain
 
 # === Main RAG Answer Generator ===
 def generate_answer(
     question: str,
     context_chunks: List[str],
-    llm_provider: str = "groq"
+    llm_provider: str = "groq",
+    priority: int = PRIORITY_INTERACTIVE,
 ) -> str:
     """
     Generates an answer to the question using RAG (retrieved chunks).
     Falls back to LLM's own knowledge if context is insufficient.
+    Both Groq calls go through the shared rate-limited scheduler.
 
     Parameters:
         question (str): User query
         context_chunks (List[str]): Retrieved text chunks
         llm_provider (str): Only 'groq' is supported in this version
+        priority (int): Scheduler priority; interactive answers by default
 
     Returns:
         str: Final answer string
@@ -70,12 +104,17 @@ def generate_answer(
         raise ValueError(f"[generate_answer] Unsupported LLM provider: {llm_provider}")
 
     cleaned_chunks = [str(chunk) for chunk in context_chunks]
+    scheduler = get_scheduler()
 
     try:
-        rag_answer = groq_rag_chain.invoke({
-            "context_chunks": cleaned_chunks,
-            "question": question
-        }).strip()
+        rag_answer = scheduler.call(
+            lambda: _get_groq_rag_chain().invoke({
+                "context_chunks": cleaned_chunks,
+                "question": question
+            }),
+            tokens=estimate_tokens(prompt_template.template + question + "".join(cleaned_chunks)),
+            priority=priority,
+        ).strip()
     except Exception as e:
         return f"[LangChain Groq Error] {str(e)}"
 
@@ -89,9 +128,12 @@ def generate_answer(
 
     if any(trigger in rag_answer.lower() for trigger in fallback_triggers):
         print("⚠️ Insufficient context — falling back to Groq model's own knowledge...")
+        fallback_prompt = f"Answer the following question using your own knowledge:\n\n{question}"
         try:
-            fallback_response = groq_llm.invoke(
-                f"Answer the following question using your own knowledge:\n\n{question}"
+            fallback_response = scheduler.call(
+                lambda: _get_groq_llm().invoke(fallback_prompt),
+                tokens=estimate_tokens(fallback_prompt),
+                priority=priority,
             )
             return fallback_response.strip()  # type: ignore
         except Exception as e:
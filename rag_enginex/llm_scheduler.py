@@ -0,0 +1,308 @@
+"""
+Shared, priority-aware rate limiter for Groq calls.
+
+Answer generation and LLM-based evaluation draw on the same Groq quota. All
+calls go through one LLMScheduler, which enforces token-bucket limits on
+requests/min and tokens/min and grants capacity strictly by priority:
+interactive answers first, evaluation only when no answer is waiting. Callers
+that cannot be served block in a queue until capacity frees up or their
+deadline passes. Rate-limit (429) responses pause the whole scheduler for the
+server-suggested interval and the call is retried.
+
+Limits are read from the environment when the shared scheduler is created:
+
+    RAG_GROQ_RPM   requests per minute (default 30)
+    RAG_GROQ_TPM   tokens per minute   (default 30000)
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_EVALUATION = 10
+
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_EVALUATION: "evaluation"}
+
+# Default queueing deadlines (seconds) per priority
+DEFAULT_DEADLINES = {PRIORITY_INTERACTIVE: 30.0, PRIORITY_EVALUATION: 300.0}
+
+
+class SchedulerTimeout(TimeoutError):
+    """
+    Raised when a call could not be granted capacity before its deadline.
+    """
+
+
+def estimate_tokens(text: str, max_output_tokens: int = 512) -> int:
+    """
+    Rough token estimate for a prompt plus its completion (~4 characters per token).
+    """
+    return len(text) // 4 + max_output_tokens
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    True if `error` looks like an HTTP 429 from the provider.
+    """
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Extract the Retry-After hint from a provider error, if it carries one.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket sized to one minute of quota.
+    """
+
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive.")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until `amount` can be taken (0 if available now).
+        """
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """
+    Grants Groq call capacity by priority under requests/min and tokens/min limits.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float = 30000,
+        max_retries: int = 3,
+        history: int = 1000,
+    ):
+        """
+        Args:
+            requests_per_minute (float): Request quota.
+            tokens_per_minute (float): Token quota (prompt + completion).
+            max_retries (int): Retries after a rate-limit error before giving up.
+            history (int): Recent wait times kept per priority for the metrics.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+        self._history = history
+        self._waits: Dict[int, deque] = {}
+        self._counters = {"granted": 0, "timeouts": 0, "rate_limited": 0, "in_flight": 0}
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        return cls(
+            requests_per_minute=float(os.environ.get("RAG_GROQ_RPM", 30)),
+            tokens_per_minute=float(os.environ.get("RAG_GROQ_TPM", 30000)),
+        )
+
+    # ----------------------------
+    # Admission
+    # ----------------------------
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """
+        Block until this call may proceed, consuming one request and `tokens` tokens.
+
+        Only the highest-priority waiter (FIFO within a priority) can take
+        capacity, so a queued evaluation call never overtakes an answer.
+
+        Raises:
+            SchedulerTimeout: If capacity was not granted within `timeout` seconds.
+        """
+        if timeout is None:
+            timeout = DEFAULT_DEADLINES.get(priority, DEFAULT_DEADLINES[PRIORITY_EVALUATION])
+        enqueued = time.monotonic()
+        deadline = enqueued + timeout
+        ticket = (priority, next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._waiting[0] == ticket:
+                        wait = max(
+                            self._paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(tokens, now),
+                        )
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            heapq.heappop(self._waiting)
+                            self._record_grant(priority, now - enqueued)
+                            self._cond.notify_all()
+                            return
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise SchedulerTimeout(
+                            f"No Groq capacity for {PRIORITY_NAMES.get(priority, priority)} call "
+                            f"within {timeout:.1f}s ({len(self._waiting)} queued)."
+                        )
+                    self._cond.wait(min(wait, remaining) if wait is not None else remaining)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def pause(self, seconds: float):
+        """
+        Stop granting capacity for `seconds` (used after a 429).
+        """
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Run `fn` once capacity is granted, retrying after rate-limit errors.
+
+        Args:
+            fn: Zero-argument callable performing the Groq request.
+            tokens (int): Estimated tokens for the call (see estimate_tokens).
+            priority (int): PRIORITY_INTERACTIVE or PRIORITY_EVALUATION.
+            timeout (float, optional): Total seconds the call may spend queued.
+                Defaults to DEFAULT_DEADLINES for the priority.
+
+        Raises:
+            SchedulerTimeout: If the deadline passes while queued.
+            Exception: Whatever `fn` raises, once retries are exhausted.
+        """
+        if timeout is None:
+            timeout = DEFAULT_DEADLINES.get(priority, DEFAULT_DEADLINES[PRIORITY_EVALUATION])
+        deadline = time.monotonic() + timeout
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority=priority, timeout=deadline - time.monotonic())
+            with self._cond:
+                self._counters["in_flight"] += 1
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                backoff = retry_after_seconds(e) or 2.0 ** attempt
+                with self._cond:
+                    self._counters["rate_limited"] += 1
+                logger.warning(f"Groq rate limit hit; pausing {backoff:.1f}s (attempt {attempt + 1})")
+                self.pause(backoff)
+            finally:
+                with self._cond:
+                    self._counters["in_flight"] -= 1
+        raise AssertionError("unreachable")
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def _record_grant(self, priority: int, waited: float):
+        self._counters["granted"] += 1
+        self._waits.setdefault(priority, deque(maxlen=self._history)).append(waited)
+
+    def stats(self) -> Dict:
+        """
+        Snapshot of queue depth, in-flight calls, counters and recent wait times per priority.
+        """
+        with self._cond:
+            depth: Dict[str, int] = {}
+            for priority, _ in self._waiting:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth[name] = depth.get(name, 0) + 1
+
+            waits = {}
+            for priority, samples in self._waits.items():
+                ordered = sorted(samples)
+                waits[PRIORITY_NAMES.get(priority, str(priority))] = {
+                    "count": len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    "max": ordered[-1],
+                }
+
+            return {
+                "queue_depth": depth,
+                "wait_seconds": waits,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+                **self._counters,
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """
+    Return the process-wide scheduler shared by answer generation and evaluation.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler.from_env()
+    return _scheduler
+
+
+def set_scheduler(scheduler: LLMScheduler):
+    """
+    Replace the process-wide scheduler (e.g. with different limits for a load test).
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
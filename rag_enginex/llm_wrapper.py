@@ -1,22 +1,49 @@
 import os
-from langchain_groq import ChatGroq
 from langchain_core.language_models.chat_models import BaseChatModel
 from pydantic import SecretStr
 
 
+def resolve_groq_api_key() -> str:
+    """
+    Resolve the Groq API key at call time.
+
+    Looks in, in order:
+        - Environment variable GROQ_API_KEY (a local .env file is loaded first)
+        - Streamlit secrets, when running under Streamlit
+
+    Raises:
+        ValueError: If no key is configured.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if api_key:
+        return api_key
+
+    try:
+        import streamlit as st
+        api_key = st.secrets["GROQ_API_KEY"]
+    except Exception:
+        api_key = None
+
+    if not api_key:
+        raise ValueError("GROQ_API_KEY not found in environment variables or Streamlit secrets.")
+    return api_key
+
+
 def get_groq_llm(model: str = "llama3-8b-8192") -> BaseChatModel:
     """
     Returns a LangChain-compatible ChatGroq LLM for use in RAGAS evaluation.
 
     Requires:
-        - Environment variable GROQ_API_KEY to be set
+        - GROQ_API_KEY to be set (see resolve_groq_api_key)
     """
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise ValueError("GROQ_API_KEY environment variable is not set")
+    from langchain_groq import ChatGroq
 
     return ChatGroq(
         temperature=0.0,
         model=model,
-        api_key=SecretStr(api_key),
+        api_key=SecretStr(resolve_groq_api_key()),
+        max_retries=0,  # retries go through LLMScheduler.call, which respects the quota
     )
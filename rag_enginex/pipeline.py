@@ -1,42 +1,145 @@
+import time
+from typing import Dict, List, Optional
 from rag_enginex.loader import load_pdf_text
 from rag_enginex.chunker import chunk_text
-from rag_enginex.embedder import BGEEmbedder
+from rag_enginex.embedder import BGEEmbedder, ShardedEmbedder
 from rag_enginex.vector_store import FAISSVectorestore
+from rag_enginex.lexical_index import reciprocal_rank_fusion
+from rag_enginex.sharded_store import ShardedVectorStore, read_manifest
 from rag_enginex.reranker import rerank
 from rag_enginex.llm_answer import generate_answer
 from rag_enginex.evaluator import evaluate_sample
 
 
-def process_pdf(pdf_path: str, chunk_size: int = 800, chunk_overlap: int = 100):
+def process_pdf(pdf_path: str, chunk_size: int = 800, chunk_overlap: int = 100, embed_workers: int = 1):
     """
     Load → Chunk → Embed → Store
-    Returns: chunks, embeddings, vector_store, embedder
+    embed_workers > 1 embeds chunks with a ShardedEmbedder (one pinned process per core group).
+    Returns: chunks, embeddings (float32 np.ndarray), vector_store, embedder
     """
-    # Step 1: Load raw text from PDF
-    raw_text = load_pdf_text(pdf_path)
+    return build_index([pdf_path], chunk_size=chunk_size, chunk_overlap=chunk_overlap, embed_workers=embed_workers)
 
-    # Step 2: Chunk the text
-    chunks = chunk_text(raw_text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-    # Step 3: Embed the chunks
+def load_chunks(pdf_paths: List[str], chunk_size: int = 800, chunk_overlap: int = 100) -> List[str]:
+    """
+    Load → Chunk for several PDFs.
+    Returns: chunks, in input order
+    """
+    chunks = []
+    for pdf_path in pdf_paths:
+        raw_text = load_pdf_text(pdf_path)
+        chunks.extend(chunk_text(raw_text, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+
+    if not chunks:
+        raise ValueError("No text could be extracted from the given PDFs.")
+    return chunks
+
+
+def embed_corpus(chunks: List[str], embed_workers: int = 1, embedder: Optional[BGEEmbedder] = None):
+    """
+    Embed chunks for indexing.
+    embed_workers > 1 uses a ShardedEmbedder running `embedder`'s model; the
+    in-process model is then never loaded. Otherwise `embedder` embeds directly.
+    Returns: embeddings (float32 np.ndarray, one row per chunk)
+    """
+    embedder = embedder or BGEEmbedder()
+    if embed_workers > 1:
+        with ShardedEmbedder(model_name=embedder.model_name, num_workers=embed_workers) as sharded:
+            return sharded.embed(chunks)
+    return embedder.embed(chunks)
+
+
+def build_index(
+    pdf_paths: List[str],
+    chunk_size: int = 800,
+    chunk_overlap: int = 100,
+    embed_workers: int = 1,
+    index_path: str = "faiss_index",
+):
+    """
+    Load → Chunk → Embed → Store for several PDFs into a single index.
+    Returns: chunks, embeddings (float32 np.ndarray), vector_store, embedder
+    """
+    # Step 1 + 2: Load raw text from each PDF and chunk it
+    chunks = load_chunks(pdf_paths, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    # Step 3: Embed the chunks (the returned query embedder loads its model lazily,
+    # so with embed_workers > 1 no model copy is held in this process during ingest)
     embedder = BGEEmbedder()
-    embeddings = embedder.embed_chunks(chunks)
+    embeddings = embed_corpus(chunks, embed_workers=embed_workers, embedder=embedder)
 
-    # Step 4: Store in FAISS vector store
-    dim = len(embeddings[0])
-    vector_store = FAISSVectorestore(dim=dim)
+    # Step 4: Store in FAISS vector store (float32 matrix is indexed without copying)
+    dim = embeddings.shape[1]
+    vector_store = FAISSVectorestore(dim=dim, index_path=index_path)
     vector_store.add_embeddings(embeddings, chunks)
 
+    # Step 5: BM25 inverted index over the same chunk ids
+    vector_store.build_lexical_index()
+
     return chunks, embeddings, vector_store, embedder
 
 
-def search_vector_store(query: str, vector_store, embedder, top_k: int = 5):
+def load_index(index_path: str = "faiss_index"):
+    """
+    Load a saved index and the embedder used to query it.
+    A sharded index (see sharded_store.write_shards) is served by local shard
+    processes behind a ShardedVectorStore; call its close() when done.
+    Returns: vector_store, embedder
+    """
+    embedder = BGEEmbedder()
+    if read_manifest(index_path) is not None:
+        return ShardedVectorStore.launch_local(index_path), embedder
+
+    dim = embedder.model.get_sentence_embedding_dimension()
+    vector_store = FAISSVectorestore(dim=dim, index_path=index_path)  # type: ignore
+    vector_store.load()
+    return vector_store, embedder
+
+
+RETRIEVAL_MODES = ("hybrid", "dense", "lexical")
+
+
+def search_vector_store(
+    query: str,
+    vector_store,
+    embedder,
+    top_k: int = 5,
+    mode: str = "hybrid",
+    rrf_k: int = 60,
+):
     """
-    Embed query → Search vector store → Return top-k chunks
+    Retrieve top-k chunks for a query.
+
+    mode:
+        "dense"   → Embed query → FAISS search
+        "lexical" → BM25 search only (no query embedding)
+        "hybrid"  → Dense + BM25, fused by reciprocal rank (falls back to dense
+                    when the store has no lexical index)
     """
-    query_vector = embedder.embed_chunks([query])[0]
-    results = vector_store.search(query_vector, top_k=top_k)
-    return [chunk for chunk, _ in results]
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode}. Expected one of {RETRIEVAL_MODES}.")
+
+    # Pin one snapshot so ids from both retrievers and the chunk lookup agree,
+    # even if the store hot-swaps to a new index version mid-query
+    store = vector_store.snapshot() if hasattr(vector_store, "snapshot") else vector_store
+
+    lexical_index = getattr(store, "lexical_index", None)
+    if mode == "lexical":
+        if lexical_index is None:
+            raise ValueError("Lexical retrieval requested but the vector store has no lexical index.")
+        return [store.metadata[idx] for idx, _ in lexical_index.search(query, top_k=top_k)]
+
+    query_vector = embedder.embed([query])[0]
+    if mode == "dense" or lexical_index is None:
+        results = store.search(query_vector, top_k=top_k)
+        return [chunk for chunk, _ in results]
+
+    # Pull a deeper candidate list from each retriever so fusion has something to reorder
+    candidate_k = top_k * 3
+    dense_ids = [idx for idx, _ in store.search_ids(query_vector, top_k=candidate_k)]
+    lexical_ids = [idx for idx, _ in lexical_index.search(query, top_k=candidate_k)]
+    fused = reciprocal_rank_fusion([dense_ids, lexical_ids], k=rrf_k)
+    return [store.metadata[idx] for idx, _ in fused[:top_k]]
 
 
 def process_query(
@@ -47,26 +150,39 @@ def process_query(
     rerank_top_n: int = 3,
     use_reranker: bool = True,
     run_evaluation: bool = True,
-    ground_truth: str = ""
+    ground_truth: str = "",
+    retrieval_mode: str = "hybrid",
+    timings: Optional[Dict[str, float]] = None,
 ):
     """
     Retrieve → (optional rerank) → Answer → (optional evaluate)
+    If `timings` is given, it is filled with seconds spent per stage
+    (retrieve, rerank, generate, evaluate).
     Returns: answer, reranked_chunks, evaluation_scores (dict)
     """
+    timings = timings if timings is not None else {}
+
     # Step 1: Retrieve relevant chunks
-    retrieved_chunks = search_vector_store(question, vector_store, embedder, top_k=top_k)
+    start = time.perf_counter()
+    retrieved_chunks = search_vector_store(question, vector_store, embedder, top_k=top_k, mode=retrieval_mode)
+    timings["retrieve"] = time.perf_counter() - start
 
     # Step 2: Optional reranking
+    start = time.perf_counter()
     if use_reranker:
         reranked_chunks = rerank(question, retrieved_chunks, top_n=rerank_top_n)
     else:
         reranked_chunks = retrieved_chunks[:rerank_top_n]
+    timings["rerank"] = time.perf_counter() - start
 
     # Step 3: Generate answer
+    start = time.perf_counter()
     answer = generate_answer(question, reranked_chunks)
+    timings["generate"] = time.perf_counter() - start
 
     # Step 4: Optional evaluation (ARES + Faithfulness, Relevance, Recall, Precision)
     eval_scores = {}
+    start = time.perf_counter()
     if run_evaluation and ground_truth:
         eval_scores = evaluate_sample(
             question=question,
@@ -77,5 +193,6 @@ def process_query(
             use_ares=True,
             use_classic=True,
         )
+    timings["evaluate"] = time.perf_counter() - start
 
     return answer, reranked_chunks, eval_scores
@@ -4,14 +4,31 @@ This reranker improves retrieval accuracy by scoring how relevant
 each chunk is to the query using a CrossEncoder model.
 """
 
-from sentence_transformers import CrossEncoder
+import threading
 from typing import List , Tuple
 
-# Load CrossEncoder model once globally
+# CrossEncoder model is loaded once, on the first rerank() call
 # Can switch to a smaller model if needed for speed
 
 model_name = "BAAI/bge-reranker-base"
-reranker_model = CrossEncoder(model_name , max_length=512)
+_reranker_model = None
+_lock = threading.Lock()
+
+
+def get_reranker_model():
+    """
+    Return the shared CrossEncoder, loading it on first call.
+    """
+    global _reranker_model
+    if _reranker_model is None:
+        with _lock:
+            if _reranker_model is None:
+                from sentence_transformers import CrossEncoder
+                from rag_enginex.cpu_policy import CPUPolicy
+
+                CPUPolicy.from_env().apply()
+                _reranker_model = CrossEncoder(model_name , max_length=512)
+    return _reranker_model
 
 def rerank(query: str , chunks: List[str], top_n: int = 3) -> List[str]:
     """
@@ -30,7 +47,7 @@ def rerank(query: str , chunks: List[str], top_n: int = 3) -> List[str]:
     query_chunk_pairs: List[Tuple[str, str]] = [(query, chunk) for chunk in chunks]
 
     # Predict relevance scores for each pair
-    scores = reranker_model.predict(query_chunk_pairs)
+    scores = get_reranker_model().predict(query_chunk_pairs)
 
     # Pair scores with chunks and sort descending
     scored_chunks = sorted(zip(chunks, scores), key=lambda x: x[1], reverse=True)
@@ -0,0 +1,496 @@
+"""
+Sharded vector search for RAG-EngineX.
+
+The corpus is partitioned into N shards, each a regular FAISSVectorestore
+(FAISS + BM25) saved under `<index_path>/shard_<i>/`, whose snapshot also holds
+the global chunk ids of the shard. Shard BM25 indexes score with corpus-wide
+statistics, so their results merge exactly like one unsharded BM25 index.
+Every shard is served by a worker speaking a small RPC protocol over
+multiprocessing.connection (TCP + HMAC auth key), so a shard can live in a
+local process or on another node; launch_local() starts local stand-ins.
+
+ShardedVectorStore is the coordinator: it scatters each dense or lexical query
+to all shards in parallel, merges the per-shard top-k lists (already sorted)
+with a heap, and if some shards miss the deadline it returns the partial result
+from the shards that answered. A shard that times out or drops its connection
+is marked unhealthy and skipped until a background ping succeeds, so a hung
+shard neither stalls nor starves queries to the others. Its snapshot() has the
+IndexSnapshot interface, so pipeline.search_vector_store runs dense, lexical and
+hybrid retrieval against it unchanged.
+"""
+
+import heapq
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future, wait
+from itertools import islice
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rag_enginex import snapshots
+from rag_enginex.lexical_index import BM25Index, share_collection_stats
+from rag_enginex.vector_store import FAISSVectorestore, Vectors, as_float32_matrix
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "shards.json"
+
+Address = Tuple[str, int]
+ShardHit = Tuple[int, float, str]  # (global chunk id, l2 distance or bm25 score, chunk)
+
+
+# ----------------------------
+# Building Shards
+# ----------------------------
+def write_shards(
+    embeddings: Vectors,
+    chunks: List[str],
+    num_shards: int,
+    index_path: str = "faiss_index",
+    lexical: bool = True,
+) -> List[str]:
+    """
+    Partition embeddings/chunks into `num_shards` contiguous shards on disk.
+
+    Shards are built and saved one at a time, so beyond `embeddings` only one
+    shard's FAISS index is held in memory.
+
+    Args:
+        lexical (bool): Also give every shard a BM25 index for lexical/hybrid retrieval.
+
+    Returns:
+        List[str]: Folder of each shard.
+    """
+    matrix = as_float32_matrix(embeddings)
+    if len(matrix) != len(chunks):
+        raise ValueError("Number of embeddings must match number of chunks.")
+    if num_shards <= 0:
+        raise ValueError("num_shards must be a positive integer.")
+    num_shards = min(num_shards, len(chunks))
+
+    bounds = np.linspace(0, len(chunks), num_shards + 1).astype("int64")
+    ranges = [(int(bounds[i]), int(bounds[i + 1])) for i in range(num_shards)]
+
+    lexical_indexes: List[Optional[BM25Index]] = [None] * num_shards
+    if lexical:
+        shard_indexes = [BM25Index.build(chunks[start:end]) for start, end in ranges]
+        lexical_indexes = share_collection_stats(shard_indexes)  # type: ignore
+
+    paths = []
+    for i, (start, end) in enumerate(ranges):
+        shard_path = os.path.join(index_path, f"shard_{i}")
+        store = FAISSVectorestore(dim=matrix.shape[1], index_path=shard_path)
+        store.add_embeddings(matrix[start:end], chunks[start:end])
+        store.lexical_index = lexical_indexes[i]
+        # Global ids live inside the snapshot, so they are checksummed and swapped with it
+        store.save(extra_arrays={"ids": np.arange(start, end, dtype="int64")})
+        paths.append(shard_path)
+
+    manifest = {"dim": int(matrix.shape[1]), "num_shards": num_shards, "total": len(chunks), "lexical": lexical}
+    _write_json_atomic(os.path.join(index_path, MANIFEST_FILE), manifest)
+    return paths
+
+
+def _write_json_atomic(path: str, data: dict):
+    tmp = f"{path}.tmp-{secrets.token_hex(4)}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_manifest(index_path: str) -> Optional[dict]:
+    """
+    Return the shard manifest for `index_path`, or None if the index is not sharded.
+    """
+    manifest_file = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file) as f:
+        return json.load(f)
+
+
+# ----------------------------
+# Shard Server
+# ----------------------------
+def _handle_connection(conn, store: FAISSVectorestore, ids: np.ndarray):
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            op = request[0]
+            try:
+                if op == "search":
+                    _, query, top_k = request
+                    hits = [(int(ids[idx]), dist, store.metadata[idx]) for idx, dist in store.search_ids(query, top_k)]
+                    conn.send(("ok", hits))
+                elif op == "lexical":
+                    _, text, top_k = request
+                    if store.lexical_index is None:
+                        raise ValueError("shard has no lexical index")
+                    hits = [(int(ids[idx]), score, store.metadata[idx])
+                            for idx, score in store.lexical_index.search(text, top_k)]
+                    conn.send(("ok", hits))
+                elif op == "ping":
+                    conn.send(("ok", int(store.index.ntotal)))
+                else:
+                    conn.send(("error", f"unknown op {op!r}"))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def serve_shard(shard_path: str, dim: int, address: Address, authkey: bytes, ready=None):
+    """
+    Serve one shard over multiprocessing.connection until the process is stopped.
+
+    Each client connection is handled on its own thread; FAISS releases the GIL
+    while searching, so concurrent queries to one shard run in parallel.
+
+    Args:
+        shard_path (str): Folder written by write_shards.
+        dim (int): Embedding dimension.
+        address: (host, port) to listen on; port 0 picks a free port.
+        authkey (bytes): Shared secret clients must present.
+        ready: Optional queue; the bound address is put on it once listening.
+    """
+    store = FAISSVectorestore(dim=dim, index_path=shard_path)
+    store.load()
+    # Ids from the same snapshot version as the index; shards written before
+    # ids were part of the snapshot keep them next to it
+    folder = snapshots.snapshot_path(shard_path, store.version) if store.version else shard_path
+    ids_file = os.path.join(folder, "ids.npy")
+    if not os.path.exists(ids_file):
+        ids_file = os.path.join(shard_path, "ids.npy")
+    ids = np.load(ids_file)
+
+    listener = Listener(address, authkey=authkey)
+    if ready is not None:
+        ready.put(listener.address)
+    while True:
+        conn = listener.accept()
+        threading.Thread(target=_handle_connection, args=(conn, store, ids), daemon=True).start()
+
+
+class ShardClient:
+    """
+    RPC client for one shard, with a small pool of reusable connections.
+
+    Each request runs on its own daemon thread (see submit): connecting to a
+    hung shard blocks in the auth handshake with no deadline, and such a thread
+    must neither occupy a shared pool nor keep the interpreter from exiting.
+    """
+
+    def __init__(self, address: Address, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._pool: "queue.LifoQueue" = queue.LifoQueue()
+        self.healthy = True
+        self._probing = False
+        self._health_lock = threading.Lock()
+
+    def _request(self, message, timeout: float):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = Client(self.address, authkey=self.authkey)
+
+        try:
+            conn.send(message)
+            if not conn.poll(timeout):
+                # A late reply would desync this connection, so it is dropped rather than reused
+                conn.close()
+                raise TimeoutError(f"Shard {self.address} did not answer within {timeout:.2f}s.")
+            status, payload = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            raise
+
+        self._pool.put(conn)
+        if status != "ok":
+            raise RuntimeError(f"Shard {self.address} failed: {payload}")
+        return payload
+
+    def submit(self, fn, *args) -> Future:
+        """
+        Run fn(*args) on a new daemon thread and return its Future.
+        """
+        future: Future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def search(self, query: np.ndarray, top_k: int, timeout: float) -> List[ShardHit]:
+        return self._request(("search", query, top_k), timeout)
+
+    def lexical_search(self, query: str, top_k: int, timeout: float) -> List[ShardHit]:
+        return self._request(("lexical", query, top_k), timeout)
+
+    def ping(self, timeout: float = 5.0) -> int:
+        return self._request(("ping",), timeout)
+
+    def mark_unhealthy(self, reason: str):
+        with self._health_lock:
+            if self.healthy:
+                logger.warning(f"Shard {self.address} marked unhealthy: {reason}")
+            self.healthy = False
+
+    def probe(self, timeout: float):
+        """
+        Ping the shard in the background; it is marked healthy again once a ping succeeds.
+        At most one probe is in flight at a time.
+        """
+        with self._health_lock:
+            if self.healthy or self._probing:
+                return
+            self._probing = True
+
+        def run():
+            try:
+                self.ping(timeout)
+            except Exception:
+                return
+            else:
+                with self._health_lock:
+                    self.healthy = True
+                logger.info(f"Shard {self.address} is healthy again")
+            finally:
+                with self._health_lock:
+                    self._probing = False
+
+        self.submit(run)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# ----------------------------
+# Coordinator
+# ----------------------------
+class ShardedVectorStore:
+    """
+    Scatter-gather coordinator over shard workers, query-compatible with FAISSVectorestore.
+    """
+
+    def __init__(self, clients: Sequence[ShardClient], dim: int, timeout: float = 2.0, processes=None,
+                 lexical: bool = False):
+        """
+        Args:
+            clients: One ShardClient per shard.
+            dim (int): Embedding dimension.
+            timeout (float): Per-query deadline in seconds; shards that miss it
+                are left out of that query's result and skipped until they
+                answer a ping again.
+            processes: Local shard processes owned by this store (see launch_local).
+            lexical (bool): Whether the shards serve BM25 queries (see write_shards).
+        """
+        if not clients:
+            raise ValueError("At least one shard is required.")
+        self.clients = list(clients)
+        self.dim = dim
+        self.timeout = timeout
+        self.lexical = lexical
+        self._processes = list(processes or [])
+        self.partial_results = 0  # queries answered by only a subset of shards
+
+    @classmethod
+    def connect(cls, addresses: Sequence[Address], authkey: bytes, dim: int, timeout: float = 2.0,
+                lexical: bool = False):
+        """
+        Coordinator for shard servers that are already running (e.g. on other nodes).
+        """
+        clients = [ShardClient(tuple(a), authkey) for a in addresses]  # type: ignore
+        return cls(clients, dim=dim, timeout=timeout, lexical=lexical)
+
+    @classmethod
+    def launch_local(cls, index_path: str = "faiss_index", timeout: float = 2.0, startup_timeout: float = 120.0):
+        """
+        Start one local shard process per shard in `index_path` and connect to them.
+        """
+        manifest = read_manifest(index_path)
+        if manifest is None:
+            raise FileNotFoundError(f"No {MANIFEST_FILE} in {index_path}; build shards with write_shards first.")
+
+        ctx = mp.get_context("spawn")
+        authkey = secrets.token_bytes(16)
+        processes, readies = [], []
+        try:
+            for i in range(manifest["num_shards"]):
+                ready = ctx.Queue()
+                process = ctx.Process(
+                    target=serve_shard,
+                    args=(os.path.join(index_path, f"shard_{i}"), manifest["dim"], ("127.0.0.1", 0), authkey, ready),
+                    daemon=True,
+                )
+                process.start()
+                processes.append(process)
+                readies.append(ready)
+
+            # Shards load in parallel; each reports its bound address once listening
+            clients = [ShardClient(ready.get(timeout=startup_timeout), authkey) for ready in readies]
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            raise
+        return cls(clients, dim=manifest["dim"], timeout=timeout, processes=processes,
+                   lexical=manifest.get("lexical", False))
+
+    def _scatter(self, request: Callable[[ShardClient], List[ShardHit]]) -> List[List[ShardHit]]:
+        """
+        Run `request` against every healthy shard in parallel and collect the answers received by the deadline.
+        """
+        deadline = time.monotonic() + self.timeout
+        futures = {}
+        for client in self.clients:
+            if client.healthy:
+                futures[client] = client.submit(request, client)
+            else:
+                client.probe(self.timeout)
+        done, _ = wait(list(futures.values()), timeout=max(0.0, deadline - time.monotonic()))
+
+        per_shard = []
+        for client, future in futures.items():
+            if future not in done:
+                client.mark_unhealthy(f"no answer within {self.timeout:.2f}s")
+            elif future.exception() is not None:
+                error = future.exception()
+                logger.warning(f"Shard {client.address} left out of results: {error!r}")
+                if not isinstance(error, RuntimeError):  # transport failure rather than a shard-side error
+                    client.mark_unhealthy(repr(error))
+            else:
+                per_shard.append(future.result())
+
+        if not per_shard:
+            raise RuntimeError("No shard answered the query.")
+        if len(per_shard) < len(self.clients):
+            self.partial_results += 1
+        return per_shard
+
+    def search_hits(self, query_vector: Vectors, top_k: int = 5) -> List[ShardHit]:
+        """
+        Scatter the query to every shard and merge their top-k lists.
+
+        Returns:
+            List of (global_chunk_id, l2_distance, chunk), nearest first.
+        """
+        if top_k <= 0:
+            raise ValueError("top_k must be a positive integer.")
+        query = as_float32_matrix(query_vector)
+        if query.shape != (1, self.dim):
+            raise ValueError(f"Query vector dimension mismatch. Expected (1, {self.dim}), got {query.shape}.")
+
+        per_shard = self._scatter(lambda client: client.search(query, top_k, self.timeout))
+        # Each shard list is sorted by distance, so a lazy k-way heap merge suffices
+        return list(islice(heapq.merge(*per_shard, key=lambda hit: hit[1]), top_k))
+
+    def lexical_search_hits(self, query: str, top_k: int = 5) -> List[ShardHit]:
+        """
+        Scatter a BM25 query to every shard and merge their top-k lists.
+
+        Returns:
+            List of (global_chunk_id, bm25_score, chunk), best first.
+        """
+        if not self.lexical:
+            raise ValueError("This sharded index was built without BM25 indexes.")
+        if top_k <= 0:
+            raise ValueError("top_k must be a positive integer.")
+
+        per_shard = self._scatter(lambda client: client.lexical_search(query, top_k, self.timeout))
+        return list(islice(heapq.merge(*per_shard, key=lambda hit: -hit[1]), top_k))
+
+    def search_ids(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[int, float]]:
+        return [(gid, dist) for gid, dist, _ in self.search_hits(query_vector, top_k)]
+
+    def search(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[str, float]]:
+        return [(chunk, dist) for _, dist, chunk in self.search_hits(query_vector, top_k)]
+
+    def snapshot(self) -> "ShardedQueryView":
+        """
+        Return a per-query view with the IndexSnapshot interface (see ShardedQueryView).
+        """
+        return ShardedQueryView(self)
+
+    def close(self):
+        """
+        Close connections and stop any local shard processes this store started.
+        """
+        for client in self.clients:
+            client.close()
+        for process in self._processes:
+            process.terminate()
+            process.join(timeout=5)
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ShardedQueryView:
+    """
+    One query's view of a ShardedVectorStore, with the IndexSnapshot interface
+    that pipeline.search_vector_store uses: search()/search_ids(),
+    lexical_index.search() and metadata[chunk_id].
+
+    Shards return the chunk text with every hit, so `metadata` is a dict of
+    the chunks this view has returned so far and ids resolve without another
+    round trip. Create one view per query (ShardedVectorStore.snapshot()).
+    """
+
+    def __init__(self, store: ShardedVectorStore):
+        self.store = store
+        self.metadata: Dict[int, str] = {}
+        self.lexical_index = _ShardedLexicalIndex(self) if store.lexical else None
+
+    def remember(self, hits: List[ShardHit]) -> List[ShardHit]:
+        for gid, _, chunk in hits:
+            self.metadata[gid] = chunk
+        return hits
+
+    def search_ids(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[int, float]]:
+        return [(gid, dist) for gid, dist, _ in self.remember(self.store.search_hits(query_vector, top_k))]
+
+    def search(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[str, float]]:
+        return [(chunk, dist) for _, dist, chunk in self.remember(self.store.search_hits(query_vector, top_k))]
+
+
+class _ShardedLexicalIndex:
+    """
+    BM25Index.search() over all shards, resolving ids through the owning view.
+    """
+
+    def __init__(self, view: ShardedQueryView):
+        self.view = view
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        hits = self.view.remember(self.view.store.lexical_search_hits(query, top_k))
+        return [(gid, score) for gid, score, _ in hits]
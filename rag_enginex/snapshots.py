@@ -0,0 +1,210 @@
+"""
+Versioned, immutable on-disk index snapshots.
+
+Layout under an index folder:
+
+    faiss_index/
+        CURRENT                  # name of the live version, replaced atomically
+        versions/
+            v1729331234567890/   # one immutable snapshot
+                index.faiss
+                chunks.pkl
+                bm25.npz
+                manifest.json    # version, created, sha256 of every file, extras
+
+A snapshot is written into a hidden temporary folder, fsynced, checksummed and
+renamed into place in one step, and only then published by atomically
+replacing CURRENT. Readers therefore only ever see complete snapshots, and a
+crash mid-write leaves the previous version live. Old versions are removed by
+gc_snapshots.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import secrets
+import shutil
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+MANIFEST_FILE = "manifest.json"
+_TMP_PREFIX = ".tmp-"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fsync_file(path: str):
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: str):
+    # Directory fsync makes renames durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def snapshot_path(index_path: str, version: str) -> str:
+    return os.path.join(index_path, VERSIONS_DIR, version)
+
+
+def current_version(index_path: str) -> Optional[str]:
+    """
+    Return the live version name, or None if the folder holds no snapshots.
+    """
+    try:
+        with open(os.path.join(index_path, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(index_path: str, version: str):
+    """
+    Atomically point CURRENT at `version`.
+    """
+    if not os.path.isdir(snapshot_path(index_path, version)):
+        raise FileNotFoundError(f"Snapshot {version} not found in {index_path}.")
+    tmp = os.path.join(index_path, f"{_TMP_PREFIX}{CURRENT_FILE}-{secrets.token_hex(4)}")
+    with open(tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(index_path, CURRENT_FILE))
+    _fsync_dir(index_path)
+
+
+def write_snapshot(index_path: str, write_files: Callable[[str], None], extra: Optional[Dict] = None) -> str:
+    """
+    Write and publish a new snapshot.
+
+    Args:
+        index_path (str): Index folder.
+        write_files: Called with a temporary folder to write the snapshot files into.
+        extra (dict, optional): Additional fields stored in the manifest.
+
+    Returns:
+        str: The new version name (now live).
+    """
+    versions_dir = os.path.join(index_path, VERSIONS_DIR)
+    os.makedirs(versions_dir, exist_ok=True)
+    version = f"v{time.time_ns()}"
+    tmp = os.path.join(versions_dir, f"{_TMP_PREFIX}{version}")
+    os.makedirs(tmp)
+
+    try:
+        write_files(tmp)
+        files = {}
+        for name in sorted(os.listdir(tmp)):
+            path = os.path.join(tmp, name)
+            _fsync_file(path)
+            files[name] = _sha256(path)
+
+        manifest = {"version": version, "created": time.time(), "files": files, **(extra or {})}
+        manifest_file = os.path.join(tmp, MANIFEST_FILE)
+        with open(manifest_file, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_dir(tmp)
+
+        os.rename(tmp, os.path.join(versions_dir, version))
+        _fsync_dir(versions_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    publish(index_path, version)
+    return version
+
+
+def read_snapshot(index_path: str, version: str, verify: bool = True) -> Dict:
+    """
+    Return the manifest of `version`, checking every file against its checksum.
+
+    Raises:
+        ValueError: If a file is missing or does not match the manifest.
+    """
+    path = snapshot_path(index_path, version)
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    if verify:
+        for name, expected in manifest["files"].items():
+            file_path = os.path.join(path, name)
+            if not os.path.exists(file_path):
+                raise ValueError(f"Snapshot {version} is missing {name}.")
+            if _sha256(file_path) != expected:
+                raise ValueError(f"Checksum mismatch for {name} in snapshot {version}.")
+    return manifest
+
+
+def list_versions(index_path: str) -> List[str]:
+    """
+    Complete snapshot versions, oldest first.
+    """
+    versions_dir = os.path.join(index_path, VERSIONS_DIR)
+    if not os.path.isdir(versions_dir):
+        return []
+    names = [n for n in os.listdir(versions_dir) if n.startswith("v") and n[1:].isdigit()]
+    return sorted(names, key=lambda n: int(n[1:]))
+
+
+def gc_snapshots(index_path: str, keep: int = 3, tmp_max_age: float = 3600.0) -> List[str]:
+    """
+    Delete old snapshots, keeping the `keep` newest plus the live one.
+
+    Versions older than the live one are kept as a margin for readers still
+    loading them; abandoned temporary folders older than `tmp_max_age` seconds
+    (left by crashed writers) are removed as well.
+
+    Returns:
+        List[str]: Names of the removed folders.
+    """
+    if keep < 1:
+        raise ValueError("keep must be at least 1.")
+    versions_dir = os.path.join(index_path, VERSIONS_DIR)
+    live = current_version(index_path)
+    removed = []
+
+    for name in list_versions(index_path)[:-keep]:
+        if name == live:
+            continue
+        shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+        removed.append(name)
+
+    now = time.time()
+    for folder in (versions_dir, index_path):
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if name.startswith(_TMP_PREFIX) and now - os.path.getmtime(path) > tmp_max_age:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+                removed.append(name)
+
+    if removed:
+        logger.info(f"Removed {len(removed)} old snapshot(s) from {index_path}")
+    return removed
@@ -1,12 +1,110 @@
 import faiss
+import logging
 import numpy as np
 import os
 import pickle
-from typing import List , Tuple
+import threading
+from typing import Dict , List , Optional , Tuple , Union
+
+from rag_enginex.lexical_index import BM25Index
+from rag_enginex import snapshots
+
+logger = logging.getLogger(__name__)
+
+Vectors = Union[np.ndarray, List[List[float]]]
+
+
+def as_float32_matrix(vectors: Vectors) -> np.ndarray:
+    """
+    View `vectors` as a C-contiguous float32 2-D array.
+
+    Arrays that already are float32 and contiguous are returned without a copy;
+    nested lists (the legacy API) are converted once.
+    """
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return matrix
+
+
+class IndexSnapshot:
+    """
+    One consistent view of an index: FAISS index, chunk list and BM25 index.
+
+    FAISSVectorestore swaps whole snapshots with a single attribute assignment,
+    so a reader holding a snapshot never sees an index and metadata from
+    different versions. Take one with FAISSVectorestore.snapshot() when several
+    calls must agree (e.g. search_ids followed by metadata lookups).
+    """
+
+    __slots__ = ("index", "metadata", "lexical_index", "dim", "version")
+
+    def __init__(self, index, metadata: List[str], lexical_index: Optional[BM25Index], dim: int,
+                 version: Optional[str] = None):
+        self.index = index
+        self.metadata = metadata
+        self.lexical_index = lexical_index
+        self.dim = dim
+        self.version = version
+
+    def replace(self, **changes) -> "IndexSnapshot":
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return IndexSnapshot(**fields)
+
+    def search_ids(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Search for top-k nearest chunk ids given a query vector.
+
+        Args:
+            query_vector (np.ndarray | List[float]): Embedding of the query.
+            top_k (int): Number of top results to return.
+
+        Returns:
+            List of tuples: (chunk_id, l2_distance), nearest first. chunk_id indexes self.metadata.
+        """
+        if not self.index.ntotal:
+            print("Warning: FAISS index is empty. No search performed.")
+            return []
+
+        if top_k <= 0:
+            raise ValueError("top_k must be a positive integer.")
+
+        query = as_float32_matrix(query_vector)
+        if query.shape[0] != 1:
+            raise ValueError(f"Expected a single query vector, got {query.shape[0]}.")
+        if query.shape[1] != self.dim:
+            raise ValueError(f"Query vector dimension mismatch. Expected {self.dim}, got {query.shape[1]}.")
+
+        # Ensure top_k doesn't exceed the number of indexed items
+        actual_top_k = min(top_k, self.index.ntotal) 
+
+        distances, indices = self.index.search(query, actual_top_k) # type: ignore
+        results = []
+        for idx, dist in zip(indices[0], distances[0]):
+            # FAISS pads with -1 when fewer than top_k results exist; with proper
+            # `add_embeddings` idx < len(self.metadata) should always hold.
+            if 0 <= idx < len(self.metadata): 
+                results.append((int(idx), float(dist)))
+        return results
+
+    def search(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Search for top-k similar chunks given a query vector.
+
+        Returns:
+            List of tuples: (matched_chunk, similarity_score)
+        """
+        return [(self.metadata[idx], dist) for idx, dist in self.search_ids(query_vector, top_k=top_k)]
+
 
 class FAISSVectorestore:
     """
     Handles storing and querying embeddings using FAISS.
+
+    Saved indexes are immutable, versioned snapshots (see rag_enginex.snapshots).
+    load()/refresh() build the new version fully in memory and then swap it in
+    atomically, so queries keep being served from the old version meanwhile.
     """
 
     def __init__(self,dim: int, index_path: str = "faiss_index", save_metadata: bool = True):
@@ -20,89 +118,181 @@ class FAISSVectorestore:
         """
         self.dim = dim
         self.index_path = index_path
-        self.index = faiss.IndexFlatL2(dim)
-        self.metadata = []  # Corresponding chunks
         self.save_metadata = save_metadata
+        self._snapshot = IndexSnapshot(faiss.IndexFlatL2(dim), [], None, dim)
+        self._refresh_stop: Optional[threading.Event] = None
+
+
+    # Attribute access goes through the current snapshot; assignment swaps in a new one
+    @property
+    def index(self):
+        return self._snapshot.index
+
+    @index.setter
+    def index(self, value):
+        self._snapshot = self._snapshot.replace(index=value)
+
+    @property
+    def metadata(self) -> List[str]:
+        return self._snapshot.metadata
 
+    @metadata.setter
+    def metadata(self, value: List[str]):
+        self._snapshot = self._snapshot.replace(metadata=value)
+
+    @property
+    def lexical_index(self) -> Optional[BM25Index]:
+        """
+        BM25 over self.metadata, see build_lexical_index.
+        """
+        return self._snapshot.lexical_index
+
+    @lexical_index.setter
+    def lexical_index(self, value: Optional[BM25Index]):
+        self._snapshot = self._snapshot.replace(lexical_index=value)
+
+    @property
+    def version(self) -> Optional[str]:
+        """
+        Snapshot version currently served (None if built in memory and not yet saved).
+        """
+        return self._snapshot.version
 
-    def add_embeddings(self, embeddings: List[List[float]], chunks: List[str]):
+    def snapshot(self) -> IndexSnapshot:
+        """
+        Return the current consistent view of the index.
+        """
+        return self._snapshot
+
+
+    def add_embeddings(self, embeddings: Vectors, chunks: List[str]):
         """
         Add embeddings and corresponding chunks to the FAISS index.
 
+        The additions go into a new snapshot that is swapped in once complete;
+        snapshots taken before the call are left untouched. Adding to a
+        non-empty index therefore copies it, so build large indexes with one
+        call (or into a separate store that is saved and refresh()ed).
+
         Args:
-            embeddings (List[List[float]]): Embedding vectors.
+            embeddings (np.ndarray | List[List[float]]): Embedding vectors; a
+                float32 (n, dim) array is added without copying.
             chunks (List[str]): Corresponding text chunks.
         """
-        if not embeddings or not chunks:
+        if len(embeddings) == 0 or not chunks:
             print("Warning: Attempted to add empty embeddings or chunks.")
             return
         if len(embeddings) != len(chunks):
             raise ValueError("Number of embeddings must match number of chunks.")
 
-        np_embeddings = np.array(embeddings).astype("float32")
+        np_embeddings = as_float32_matrix(embeddings)
         if np_embeddings.shape[1] != self.dim:
             raise ValueError(f"Embedding dimension mismatch. Expected {self.dim}, got {np_embeddings.shape[1]}.")
 
-        self.index.add(np_embeddings) # type: ignore
-        self.metadata.extend(chunks)
+        snap = self._snapshot
+        index = faiss.clone_index(snap.index)
+        index.add(np_embeddings) # type: ignore
+        metadata = snap.metadata + list(chunks)
+        lexical_index = snap.lexical_index
+        if lexical_index is not None:
+            lexical_index = BM25Index.build(metadata, k1=lexical_index.k1, b=lexical_index.b)
+
+        # Single assignment; the result no longer matches any saved version
+        self._snapshot = IndexSnapshot(index, metadata, lexical_index, self.dim)
 
 
-    def search(self, query_vector: List[float], top_k: int = 5) -> List[Tuple[str, float]]:
+    def build_lexical_index(self, k1: float = 1.5, b: float = 0.75):
         """
-        Search for top-k similar chunks given a query vector.
+        Build (or rebuild) the BM25 index over all stored chunks.
+
+        Document ids in the lexical index are the same positions FAISS uses,
+        so search_ids results from both can be fused directly.
+        """
+        self.lexical_index = BM25Index.build(self.metadata, k1=k1, b=b)
+
+
+    def search_ids(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Search for top-k nearest chunk ids given a query vector.
 
         Args:
-            query_vector (List[float]): Embedding of the query.
+            query_vector (np.ndarray | List[float]): Embedding of the query.
             top_k (int): Number of top results to return.
 
         Returns:
-            List of tuples: (matched_chunk, similarity_score)
-
+            List of tuples: (chunk_id, l2_distance), nearest first. chunk_id indexes self.metadata.
         """
-        if not self.index.ntotal:
-            print("Warning: FAISS index is empty. No search performed.")
-            return []
+        return self._snapshot.search_ids(query_vector, top_k=top_k)
 
-        if top_k <= 0:
-            raise ValueError("top_k must be a positive integer.")
 
-        query = np.array(query_vector).astype("float32").reshape(1, -1)
-        if query.shape[1] != self.dim:
-            raise ValueError(f"Query vector dimension mismatch. Expected {self.dim}, got {query.shape[1]}.")
+    def search(self, query_vector: Vectors, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Search for top-k similar chunks given a query vector.
 
-        # Ensure top_k doesn't exceed the number of indexed items
-        actual_top_k = min(top_k, self.index.ntotal) 
+        Args:
+            query_vector (np.ndarray | List[float]): Embedding of the query.
+            top_k (int): Number of top results to return.
 
-        distances, indices = self.index.search(query, actual_top_k) # type: ignore
-        results = []
-        for idx, dist in zip(indices[0], distances[0]):
-            # This check `idx < len(self.metadata)` is good, though with proper
-            # `add_embeddings` it should always hold.
-            if idx < len(self.metadata): 
-                results.append((self.metadata[idx], float(dist)))
-        return results
+        Returns:
+            List of tuples: (matched_chunk, similarity_score)
+
+        """
+        return self._snapshot.search(query_vector, top_k=top_k)
     
 
-    def save(self):
+    def save(self, keep_versions: int = 3, extra_arrays: Optional[Dict[str, np.ndarray]] = None) -> str:
         """
-        Save FAISS index and chunk metadata to disk.
+        Save FAISS index, chunk metadata and BM25 index as a new snapshot and publish it.
+
+        Args:
+            keep_versions (int): Snapshots to retain; older ones are garbage-collected.
+            extra_arrays (dict, optional): Arrays saved as `<name>.npy` inside the
+                snapshot, so they are checksummed and swapped together with the index.
+
+        Returns:
+            str: The published version.
         """
+        snap = self._snapshot
+
+        def write_files(folder: str):
+            faiss.write_index(snap.index, os.path.join(folder, "index.faiss"))
+            if self.save_metadata:
+                with open(os.path.join(folder, "chunks.pkl"), "wb") as f:
+                    pickle.dump(snap.metadata, f)
+            if snap.lexical_index is not None:
+                snap.lexical_index.save(os.path.join(folder, "bm25.npz"))
+            for name, array in (extra_arrays or {}).items():
+                np.save(os.path.join(folder, f"{name}.npy"), array)
+
         os.makedirs(self.index_path, exist_ok=True)
-        faiss.write_index(self.index, os.path.join(self.index_path, "index.faiss"))
-        if self.save_metadata:
-            with open(os.path.join(self.index_path, "chunks.pkl"), "wb") as f:
-                pickle.dump(self.metadata, f)
+        version = snapshots.write_snapshot(
+            self.index_path, write_files, extra={"dim": self.dim, "ntotal": int(snap.index.ntotal)}
+        )
+        self._snapshot = snap.replace(version=version)
+        snapshots.gc_snapshots(self.index_path, keep=keep_versions)
+        return version
 
 
-    def load(self):
+    def load(self, verify: bool = True):
         """
         Load FAISS index and metadata from disk.
+
+        Loads the published snapshot (checksums verified unless verify=False),
+        or the legacy flat layout for indexes saved before versioning. The new
+        data is swapped in only once it is fully loaded.
         """
-        index_file = os.path.join(self.index_path, "index.faiss")
-        metadata_file = os.path.join(self.index_path, "chunks.pkl")
+        version = snapshots.current_version(self.index_path)
+        if version is not None:
+            snapshots.read_snapshot(self.index_path, version, verify=verify)
+            folder = snapshots.snapshot_path(self.index_path, version)
+        else:
+            folder = self.index_path
+
+        index_file = os.path.join(folder, "index.faiss")
+        metadata_file = os.path.join(folder, "chunks.pkl")
 
         if os.path.exists(index_file):
-            self.index = faiss.read_index(index_file)
+            index = faiss.read_index(index_file)
             print(f"FAISS index loaded from {index_file}")
         else:
             # Option 1: Raise error (current behavior, explicit)
@@ -112,11 +302,61 @@ class FAISSVectorestore:
             # self.index = faiss.IndexFlatL2(self.dim)
 
 
+        metadata = self.metadata
         if self.save_metadata and os.path.exists(metadata_file):
             with open(metadata_file, "rb") as f:
-                self.metadata = pickle.load(f)
+                metadata = pickle.load(f)
             print(f"Metadata loaded from {metadata_file}")
         elif self.save_metadata and not os.path.exists(metadata_file):
             print(f"Warning: Metadata file not found at {metadata_file}. Metadata will be empty.")
-            self.metadata = [] # Ensure metadata is empty if file is missing
-        
+            metadata = [] # Ensure metadata is empty if file is missing
+
+        lexical_file = os.path.join(folder, "bm25.npz")
+        lexical_index = None
+        if os.path.exists(lexical_file):
+            lexical_index = BM25Index.load(lexical_file)
+            print(f"BM25 index loaded from {lexical_file}")
+
+        # Single assignment: readers see either the old snapshot or the new one
+        self._snapshot = IndexSnapshot(index, metadata, lexical_index, self.dim, version)
+
+
+    def refresh(self) -> bool:
+        """
+        Hot-swap to the published snapshot if it differs from the one being served.
+
+        Returns:
+            bool: True if a new version was loaded.
+        """
+        version = snapshots.current_version(self.index_path)
+        if version is None or version == self.version:
+            return False
+        self.load()
+        return True
+
+
+    def start_auto_refresh(self, interval: float = 10.0):
+        """
+        Poll for newly published snapshots every `interval` seconds on a daemon thread.
+        """
+        if self._refresh_stop is not None:
+            return
+        stop = threading.Event()
+        self._refresh_stop = stop
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    if self.refresh():
+                        logger.info(f"Switched {self.index_path} to snapshot {self.version}")
+                except Exception as e:
+                    # Keep serving the current snapshot; retry on the next tick
+                    logger.warning(f"Index refresh failed: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+
+
+    def stop_auto_refresh(self):
+        if self._refresh_stop is not None:
+            self._refresh_stop.set()
+            self._refresh_stop = None
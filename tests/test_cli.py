@@ -0,0 +1,91 @@
+import argparse
+import json
+
+from rag_enginex import cli
+from rag_enginex.cli import read_questions
+
+
+def test_read_questions_csv_with_bom(tmp_path):
+    path = tmp_path / "questions.csv"
+    path.write_text("question,id\nhello,x1\n", encoding="utf-8-sig")
+    assert list(read_questions(str(path))) == [{"id": "x1", "question": "hello", "ground_truth": ""}]
+
+
+def test_read_questions_skips_bad_jsonl_rows(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    lines = [
+        json.dumps({"question": "first", "ground_truth": "gt"}),
+        "{not json",
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"id": "q4"}),
+        "",
+        json.dumps({"id": "q5", "question": " last "}),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert list(read_questions(str(path))) == [
+        {"id": "1", "question": "first", "ground_truth": "gt"},
+        {"id": "q5", "question": "last", "ground_truth": ""},
+    ]
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_questions(path, ids):
+    path.write_text("".join(json.dumps({"id": i, "question": f"question {i}"}) + "\n" for i in ids))
+
+
+def run(monkeypatch, tmp_path, failing=()):
+    """Run the query loop with answer_one stubbed; ids in `failing` fail."""
+    def fake_answer_one(record, vector_store, embedder, args):
+        if record["id"] in failing:
+            return {"id": record["id"], "question": record["question"], "error": "[Groq Direct Error] 429"}
+        return {"id": record["id"], "question": record["question"], "answer": f"answer {record['id']}"}
+
+    monkeypatch.setattr(cli, "answer_one", fake_answer_one)
+    output = str(tmp_path / "answers.jsonl")
+    args = argparse.Namespace(input=str(tmp_path / "questions.jsonl"), output=output, overwrite=False,
+                              concurrency=2, batch_size=2)
+    return cli._answer_all(args, cli.completed_ids(output), None, None)
+
+
+def test_resume_skips_answered_questions(monkeypatch, tmp_path):
+    write_questions(tmp_path / "questions.jsonl", ["1", "2", "3"])
+    (tmp_path / "answers.jsonl").write_text(json.dumps({"id": "1", "answer": "old"}) + "\n")
+
+    assert run(monkeypatch, tmp_path) == 0
+    records = read_jsonl(tmp_path / "answers.jsonl")
+    assert sorted(r["id"] for r in records) == ["1", "2", "3"]
+    assert records[0]["answer"] == "old"
+
+
+def test_completed_ids_repairs_torn_last_line(tmp_path):
+    output = tmp_path / "answers.jsonl"
+    output.write_text(json.dumps({"id": "1", "answer": "a"}) + "\n" + '{"id": "2", "ans')
+
+    assert cli.completed_ids(str(output)) == {"1"}
+    assert output.read_text() == json.dumps({"id": "1", "answer": "a"}) + "\n"
+
+
+def test_failed_questions_are_retried_into_one_record_per_id(monkeypatch, tmp_path):
+    write_questions(tmp_path / "questions.jsonl", ["1", "2", "3"])
+    errors = tmp_path / "answers.errors.jsonl"
+
+    assert run(monkeypatch, tmp_path, failing={"2"}) == 1
+    assert sorted(r["id"] for r in read_jsonl(tmp_path / "answers.jsonl")) == ["1", "3"]
+    assert [r["id"] for r in read_jsonl(errors)] == ["2"]
+
+    assert run(monkeypatch, tmp_path) == 0
+    assert sorted(r["id"] for r in read_jsonl(tmp_path / "answers.jsonl")) == ["1", "2", "3"]
+    assert read_jsonl(errors) == []
+
+
+def test_resume_drops_error_records_left_in_the_output(tmp_path):
+    output = tmp_path / "answers.jsonl"
+    output.write_text(
+        json.dumps({"id": "1", "answer": "a"}) + "\n" + json.dumps({"id": "2", "error": "boom"}) + "\n"
+    )
+    assert cli.completed_ids(str(output)) == {"1"}
+    assert read_jsonl(output) == [{"id": "1", "answer": "a"}]
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from rag_enginex.cpu_policy import CPUPolicy, core_groups
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for name in ("RAG_TOKENIZERS_PARALLELISM", "TOKENIZERS_PARALLELISM", "RAG_INTRA_OP_THREADS", "RAG_INTER_OP_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_apply_keeps_user_tokenizers_parallelism(clean_env, monkeypatch):
+    monkeypatch.setenv("TOKENIZERS_PARALLELISM", "true")
+    CPUPolicy.from_env().apply()
+    assert os.environ["TOKENIZERS_PARALLELISM"] == "true"
+
+
+def test_apply_defaults_tokenizers_parallelism_off(clean_env):
+    CPUPolicy.from_env().apply()
+    assert os.environ["TOKENIZERS_PARALLELISM"] == "false"
+
+
+def test_rag_variable_overrides_tokenizers_parallelism(clean_env, monkeypatch):
+    monkeypatch.setenv("TOKENIZERS_PARALLELISM", "true")
+    monkeypatch.setenv("RAG_TOKENIZERS_PARALLELISM", "false")
+    CPUPolicy.from_env().apply()
+    assert os.environ["TOKENIZERS_PARALLELISM"] == "false"
+
+
+def test_core_groups_are_contiguous_and_balanced():
+    assert core_groups(3, cores=list(range(8))) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert core_groups(4, cores=[0, 1]) == [[0], [1]]
+
+
+def test_worker_threads_are_capped_at_the_core_group():
+    policy = CPUPolicy(intra_op_threads=32, inter_op_threads=8)
+    worker = policy.for_worker([0, 1, 2, 3])
+    assert (worker.intra_op_threads, worker.inter_op_threads) == (4, 4)
+
+    default = CPUPolicy().for_worker([0, 1, 2, 3])
+    assert (default.intra_op_threads, default.inter_op_threads) == (4, 1)
+
+    smaller = CPUPolicy(intra_op_threads=2).for_worker([0, 1, 2, 3])
+    assert smaller.intra_op_threads == 2
@@ -0,0 +1,83 @@
+import sys
+import textwrap
+import time
+
+import numpy as np
+import pytest
+
+from rag_enginex.cpu_policy import available_cores
+from rag_enginex.embedder import ShardedEmbedder
+
+# Stand-ins for torch / sentence_transformers, importable by the spawned workers
+# (spawn children inherit the parent's sys.path). Encoding a chunk equal to
+# "CRASH" kills the worker the way an OOM kill would.
+FAKE_MODULES = {
+    "torch.py": """
+        def set_num_threads(n):
+            pass
+
+        def set_num_interop_threads(n):
+            pass
+    """,
+    "sentence_transformers.py": """
+        import os
+        import numpy as np
+
+        class SentenceTransformer:
+            def __init__(self, name):
+                pass
+
+            def get_sentence_embedding_dimension(self):
+                return 4
+
+            def encode(self, texts, **kwargs):
+                if "CRASH" in texts:
+                    os._exit(137)
+                return np.array([[len(t), 0, 0, 1] for t in texts], dtype="float32")
+    """,
+}
+
+
+@pytest.fixture
+def fake_model(tmp_path, monkeypatch):
+    for name, source in FAKE_MODULES.items():
+        (tmp_path / name).write_text(textwrap.dedent(source))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for module in ("torch", "sentence_transformers"):
+        monkeypatch.delitem(sys.modules, module, raising=False)
+
+
+def two_worker_embedder(**kwargs) -> ShardedEmbedder:
+    embedder = ShardedEmbedder(num_workers=2, **kwargs)
+    # Two workers even on a single-core machine
+    embedder.groups = [available_cores()] * 2
+    return embedder
+
+
+def test_embed_keeps_input_order(fake_model):
+    chunks = ["x" * i for i in range(1, 12)]
+    with two_worker_embedder(task_size=3) as embedder:
+        out = embedder.embed(chunks)
+    assert out.dtype == np.float32 and out.flags["C_CONTIGUOUS"]
+    assert out[:, 0].tolist() == [float(i) for i in range(1, 12)]
+
+
+def test_embed_fails_fast_when_a_worker_dies(fake_model):
+    chunks = ["a", "b", "CRASH", "c", "d", "e"]
+    embedder = two_worker_embedder(task_size=1)
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="exited"):
+        embedder.embed(chunks)
+    assert time.monotonic() - start < 30
+    # The broken pool is torn down; nothing is left running
+    assert embedder._workers == []
+
+
+def test_bge_embedder_loads_model_lazily(fake_model):
+    from rag_enginex.embedder import BGEEmbedder
+
+    embedder = BGEEmbedder()
+    assert embedder._model is None and "sentence_transformers" not in sys.modules
+    out = embedder.embed(["ab", "abc"])
+    assert out[:, 0].tolist() == [2.0, 3.0]
+    assert embedder._model is not None
@@ -0,0 +1,55 @@
+import numpy as np
+
+from rag_enginex.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+CHUNKS = [
+    "The XR-200 pump is rated for 40 bar.",
+    "Jürgen Müller signed the maintenance report.",
+    "Maintenance of the pump follows the XR-200 manual, section v1.2.",
+    "東京 office contact details.",
+    "General safety instructions for the site.",
+]
+
+
+def test_tokenize_keeps_identifiers_whole():
+    assert tokenize("XR-200 v1.2 foo_bar, 40 bar.") == ["xr-200", "v1.2", "foo_bar", "40", "bar"]
+
+
+def test_tokenize_unicode():
+    assert tokenize("Jürgen Müller café 東京") == ["jürgen", "müller", "café", "東京"]
+    # Case folding and NFKC: "ß" matches "ss", a decomposed "é" matches the composed one
+    assert tokenize("Straße") == tokenize("STRASSE")
+    assert tokenize("cafe\u0301") == tokenize("caf\u00e9")
+
+
+def test_search_ranks_exact_term_matches():
+    index = BM25Index.build(CHUNKS)
+    assert [doc for doc, _ in index.search("müller")] == [1]
+    assert [doc for doc, _ in index.search("東京")] == [3]
+
+    ranked = index.search("XR-200 pump maintenance", top_k=3)
+    assert {doc for doc, _ in ranked[:2]} == {0, 2}
+    scores = [score for _, score in ranked]
+    assert scores == sorted(scores, reverse=True) and all(s > 0 for s in scores)
+
+
+def test_search_without_matches_is_empty():
+    index = BM25Index.build(CHUNKS)
+    assert index.search("nonexistent") == []
+
+
+def test_save_load_round_trip(tmp_path):
+    index = BM25Index.build(CHUNKS, k1=1.2, b=0.5)
+    path = str(tmp_path / "bm25.npz")
+    index.save(path)
+    loaded = BM25Index.load(path)
+
+    assert loaded.terms == index.terms
+    assert (loaded.k1, loaded.b) == (1.2, 0.5)
+    for query in ("müller", "XR-200 pump", "東京 office"):
+        np.testing.assert_array_equal(loaded.score(query), index.score(query))
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+    assert [doc for doc, _ in fused][:2] == [1, 3]
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from rag_enginex.llm_scheduler import (
+    PRIORITY_EVALUATION,
+    PRIORITY_INTERACTIVE,
+    LLMScheduler,
+    SchedulerTimeout,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("Error code: 429 - rate limit reached")
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+def drained(requests_per_minute=1):
+    """A scheduler whose request bucket is empty and refills far slower than any test runs."""
+    scheduler = LLMScheduler(requests_per_minute=requests_per_minute, tokens_per_minute=1e9)
+    scheduler.acquire(tokens=1)
+    return scheduler
+
+
+def add_request_capacity(scheduler, amount=1):
+    with scheduler._cond:
+        scheduler.requests.level += amount
+        scheduler._cond.notify_all()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_interactive_calls_are_granted_before_queued_evaluation():
+    scheduler = drained()
+    order = []
+
+    def call(name, priority):
+        scheduler.acquire(tokens=1, priority=priority, timeout=10)
+        order.append(name)
+
+    evaluation = threading.Thread(target=call, args=("evaluation", PRIORITY_EVALUATION))
+    evaluation.start()
+    wait_until(lambda: len(scheduler._waiting) == 1)
+    interactive = threading.Thread(target=call, args=("interactive", PRIORITY_INTERACTIVE))
+    interactive.start()
+    wait_until(lambda: len(scheduler._waiting) == 2)
+
+    add_request_capacity(scheduler)
+    wait_until(lambda: order == ["interactive"])
+    add_request_capacity(scheduler)
+    for thread in (evaluation, interactive):
+        thread.join(timeout=5)
+    assert order == ["interactive", "evaluation"]
+    assert scheduler.stats()["granted"] == 3
+
+
+def test_deadline_raises_scheduler_timeout_and_leaves_the_queue():
+    scheduler = drained()
+    start = time.monotonic()
+    with pytest.raises(SchedulerTimeout):
+        scheduler.call(lambda: "never", tokens=1, timeout=0.1)
+    assert 0.1 <= time.monotonic() - start < 1.0
+
+    stats = scheduler.stats()
+    assert stats["timeouts"] == 1 and stats["queue_depth"] == {}
+    # A timed-out waiter must not block the next caller
+    add_request_capacity(scheduler)
+    assert scheduler.call(lambda: "ok", tokens=1, timeout=1) == "ok"
+
+
+def test_rate_limit_pauses_for_retry_after_then_retries():
+    scheduler = LLMScheduler(requests_per_minute=1000, tokens_per_minute=1e9)
+    attempts = []
+
+    def fn():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RateLimitError(retry_after="0.3")
+        return "ok"
+
+    assert scheduler.call(fn, tokens=10) == "ok"
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.3
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 1 and stats["in_flight"] == 0
+
+
+def test_rate_limit_retries_are_bounded():
+    scheduler = LLMScheduler(requests_per_minute=1000, tokens_per_minute=1e9, max_retries=2)
+    scheduler.pause = lambda seconds: None  # no need to sleep through the backoff
+
+    def fn():
+        raise RateLimitError()
+
+    with pytest.raises(RateLimitError):
+        scheduler.call(fn, tokens=10)
+    assert scheduler.stats()["rate_limited"] == 2
+
+
+def test_non_rate_limit_errors_are_not_retried():
+    scheduler = LLMScheduler(requests_per_minute=1000, tokens_per_minute=1e9)
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        scheduler.call(fn, tokens=10)
+    assert attempts == [1]
+
+
+def test_rate_limit_error_detection():
+    assert is_rate_limit_error(RateLimitError())
+    assert not is_rate_limit_error(ValueError("bad request"))
+    assert retry_after_seconds(RateLimitError(retry_after="2.5")) == 2.5
+    assert retry_after_seconds(ValueError()) is None
@@ -0,0 +1,105 @@
+import os
+import signal
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from rag_enginex.lexical_index import BM25Index
+from rag_enginex.sharded_store import ShardedVectorStore, write_shards
+from rag_enginex.vector_store import FAISSVectorestore
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses SIGSTOP/SIGCONT")
+
+DIM = 16
+NUM_VECTORS = 300
+TIMEOUT = 0.3
+WORDS = ["pump", "valve", "XR-200", "Müller", "pressure", "manual", "東京", "seal", "motor", "filter"]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((NUM_VECTORS, DIM)).astype("float32")
+    chunks = [" ".join(rng.choice(WORDS, size=rng.integers(2, 12))) for _ in range(NUM_VECTORS)]
+    return vectors, chunks
+
+
+@pytest.fixture
+def sharded(corpus, tmp_path):
+    vectors, chunks = corpus
+    write_shards(vectors, chunks, num_shards=3, index_path=str(tmp_path))
+    store = ShardedVectorStore.launch_local(str(tmp_path), timeout=TIMEOUT)
+    yield store
+    for process in store._processes:
+        os.kill(process.pid, signal.SIGCONT)
+    store.close()
+
+
+def test_matches_unsharded_search(corpus, sharded):
+    vectors, chunks = corpus
+    flat = FAISSVectorestore(dim=DIM, index_path="unused")
+    flat.add_embeddings(vectors, chunks)
+    for query in vectors[:10]:
+        assert sharded.search_ids(query, top_k=8) == pytest.approx(flat.search_ids(query, top_k=8))
+
+
+def test_lexical_search_matches_unsharded_bm25(corpus, sharded):
+    _, chunks = corpus
+    flat = BM25Index.build(chunks)
+    for query in ("pump", "Müller seal", "東京 XR-200 pressure"):
+        expected = flat.search(query, top_k=10)
+        hits = sharded.lexical_search_hits(query, top_k=10)
+        assert [score for _, score, _ in hits] == pytest.approx([score for _, score in expected], rel=1e-5)
+        assert all(chunk == chunks[gid] for gid, _, chunk in hits)
+
+
+def test_snapshot_view_resolves_ids_for_hybrid_retrieval(corpus, sharded):
+    vectors, chunks = corpus
+    view = sharded.snapshot()
+    dense_ids = [gid for gid, _ in view.search_ids(vectors[7], top_k=5)]
+    lexical_ids = [gid for gid, _ in view.lexical_index.search("valve filter", top_k=5)]
+    assert dense_ids[0] == 7
+    assert all(view.metadata[gid] == chunks[gid] for gid in dense_ids + lexical_ids)
+
+
+def test_hung_shard_is_skipped_without_starving_the_others(corpus, sharded):
+    vectors, _ = corpus
+    hung = sharded._processes[1]
+    hung_ids = range(NUM_VECTORS // 3, 2 * NUM_VECTORS // 3)  # shard 1 holds the middle third
+    os.kill(hung.pid, signal.SIGSTOP)
+
+    for i in range(30):
+        start = time.monotonic()
+        hits = sharded.search_ids(vectors[i], top_k=5)
+        elapsed = time.monotonic() - start
+        assert hits and not any(gid in hung_ids for gid, _ in hits)
+        assert elapsed < TIMEOUT + 0.2
+    assert not sharded.clients[1].healthy
+    assert sharded.partial_results == 30
+
+    # Once the shard responds to a ping again it rejoins the scatter
+    os.kill(hung.pid, signal.SIGCONT)
+    deadline = time.monotonic() + 10
+    while not sharded.clients[1].healthy and time.monotonic() < deadline:
+        sharded.search_ids(vectors[0], top_k=5)
+        time.sleep(0.05)
+    assert sharded.clients[1].healthy
+    query = vectors[NUM_VECTORS // 2]  # its own nearest neighbour lives on shard 1
+    assert sharded.search_ids(query, top_k=1)[0][0] == NUM_VECTORS // 2
+
+
+def test_shard_ids_are_part_of_the_snapshot(corpus, tmp_path):
+    from rag_enginex import snapshots
+
+    vectors, chunks = corpus
+    write_shards(vectors, chunks, num_shards=2, index_path=str(tmp_path))
+    shard_path = str(tmp_path / "shard_1")
+    version = snapshots.current_version(shard_path)
+    manifest = snapshots.read_snapshot(shard_path, version)
+    assert "ids.npy" in manifest["files"]
+    ids = np.load(os.path.join(snapshots.snapshot_path(shard_path, version), "ids.npy"))
+    assert ids.tolist() == list(range(NUM_VECTORS // 2, NUM_VECTORS))
+    assert not os.path.exists(os.path.join(shard_path, "ids.npy"))
+    assert [p.name for p in tmp_path.iterdir() if ".tmp-" in p.name] == []
@@ -0,0 +1,108 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from rag_enginex import snapshots
+from rag_enginex.vector_store import FAISSVectorestore
+
+DIM = 8
+
+
+def write_version(index_path, payload):
+    def write_files(folder):
+        with open(os.path.join(folder, "data.txt"), "w") as f:
+            f.write(payload)
+
+    return snapshots.write_snapshot(str(index_path), write_files, extra={"payload": payload})
+
+
+def make_store(index_path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    store = FAISSVectorestore(dim=DIM, index_path=str(index_path))
+    store.add_embeddings(rng.standard_normal((n, DIM)).astype("float32"), [f"doc {seed} {i}" for i in range(n)])
+    store.build_lexical_index()
+    return store
+
+
+def test_write_snapshot_publishes_current(tmp_path):
+    first = write_version(tmp_path, "one")
+    second = write_version(tmp_path, "two")
+    assert snapshots.current_version(str(tmp_path)) == second
+    assert snapshots.list_versions(str(tmp_path)) == [first, second]
+    assert snapshots.read_snapshot(str(tmp_path), second)["payload"] == "two"
+
+    snapshots.publish(str(tmp_path), first)
+    assert snapshots.current_version(str(tmp_path)) == first
+    with pytest.raises(FileNotFoundError):
+        snapshots.publish(str(tmp_path), "v0")
+    assert [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")] == []
+
+
+def test_gc_keeps_newest_and_live_versions(tmp_path):
+    versions = [write_version(tmp_path, str(i)) for i in range(5)]
+    snapshots.publish(str(tmp_path), versions[0])
+
+    removed = snapshots.gc_snapshots(str(tmp_path), keep=2)
+    assert sorted(removed) == sorted(versions[1:3])
+    assert snapshots.list_versions(str(tmp_path)) == [versions[0], versions[3], versions[4]]
+
+
+def test_checksum_mismatch_is_detected(tmp_path):
+    store = make_store(tmp_path, 20)
+    version = store.save()
+    with open(os.path.join(snapshots.snapshot_path(str(tmp_path), version), "chunks.pkl"), "ab") as f:
+        f.write(b"corrupt")
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        snapshots.read_snapshot(str(tmp_path), version)
+    with pytest.raises(ValueError):
+        FAISSVectorestore(dim=DIM, index_path=str(tmp_path)).load()
+
+
+def test_add_embeddings_leaves_earlier_snapshots_untouched(tmp_path):
+    store = make_store(tmp_path, 3)
+    before = store.snapshot()
+    store.add_embeddings(np.ones((1, DIM), dtype="float32"), ["new chunk"])
+
+    assert (len(before.metadata), before.index.ntotal, before.lexical_index.num_docs) == (3, 3, 3)
+    after = store.snapshot()
+    assert (len(after.metadata), after.index.ntotal, after.lexical_index.num_docs) == (4, 4, 4)
+
+
+def test_refresh_swaps_atomically_under_concurrent_readers(tmp_path):
+    serving = make_store(tmp_path, 50, seed=1)
+    serving.save()
+    serving.load()
+    old_version = serving.version
+
+    stop = threading.Event()
+    inconsistent = []
+    reads = []
+
+    def reader():
+        while not stop.is_set():
+            snap = serving.snapshot()
+            sizes = {len(snap.metadata), snap.index.ntotal, snap.lexical_index.num_docs}
+            if len(sizes) != 1:
+                inconsistent.append(sizes)
+            reads.append(snap.version)
+            snap.search(np.zeros(DIM, dtype="float32"), top_k=3)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for i in range(5):
+            new_version = make_store(tmp_path, 60 + i * 10, seed=2 + i).save()
+            assert serving.refresh()
+            assert serving.version == new_version
+        assert not serving.refresh()  # already current
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert inconsistent == []
+    assert old_version in reads and len(serving.metadata) == 100
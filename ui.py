@@ -24,6 +24,7 @@ with st.sidebar:
     chunk_size = st.slider("🔪 Chunk Size", 100, 2000, 800, step=100)
     chunk_overlap = st.slider("🔁 Chunk Overlap", 0, 500, 100, step=50)
     top_k = st.slider("📚 Top K Chunks", 1, 10, 5)
+    retrieval_mode = st.selectbox("🔎 Retrieval Mode", ["hybrid", "dense", "lexical"], index=0)
     rerank_top_n = st.slider("🎯 Top N After Rerank", 1, top_k, 3)
 
     st.markdown("---")
@@ -90,6 +91,7 @@ with right:
                     rerank_top_n=rerank_top_n,
                     use_reranker=use_reranker,
                     run_evaluation=run_evaluation,
+                    retrieval_mode=retrieval_mode,
                     ground_truth="Reverse Supply Chain Optimizer, Auto Researcher, Flight Delay Prediction"
                 )
 